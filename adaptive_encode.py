@@ -0,0 +1,71 @@
+import io
+
+import cv2
+from PIL import Image
+
+# Square downlink sizes, largest first
+RESOLUTIONS = [(480, 480), (360, 360), (240, 240), (160, 160), (120, 120)]
+MIN_QUALITY = 5
+MAX_QUALITY = 90
+# Below this quality a smaller resolution usually looks better for the same bytes
+MIN_USEFUL_QUALITY = 20
+# Ground preview thumbnail, sent whole in one downlink packet
+THUMBNAIL_SIZES = [(64, 64), (48, 48), (32, 32)]
+THUMBNAIL_MAX_QUALITY = 50
+
+
+def encode_webp(img, quality):
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=quality)
+    return buf.getvalue()
+
+
+def _best_quality(img, budget, max_quality=MAX_QUALITY):
+    """Binary search the highest quality whose encode fits the budget. Returns (data, quality) or None."""
+    lo, hi = MIN_QUALITY, max_quality
+    best = None
+    while lo <= hi:
+        q = (lo + hi) // 2
+        data = encode_webp(img, q)
+        if len(data) <= budget:
+            best = (data, q)
+            lo = q + 1
+        else:
+            hi = q - 1
+    return best
+
+
+def encode_thumbnail(bgr, max_bytes):
+    """Largest THUMBNAIL_SIZES WebP of the frame that fits in max_bytes, or None"""
+    for size in THUMBNAIL_SIZES:
+        small = cv2.resize(bgr, size, interpolation=cv2.INTER_AREA)
+        found = _best_quality(Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB)), max_bytes,
+                              THUMBNAIL_MAX_QUALITY)
+        if found is not None:
+            return found[0]
+    return None
+
+
+def encode_to_budget(bgr, budget, resolutions=RESOLUTIONS, max_quality=MAX_QUALITY):
+    """Encode a BGR frame as the best WebP that fits in budget bytes.
+
+    Tries resolutions from largest to smallest and keeps the first one that
+    reaches MIN_USEFUL_QUALITY within the budget; otherwise returns the best
+    fit seen, or the smallest resolution at MIN_QUALITY if nothing fits.
+    Returns (data, size, quality).
+    """
+    fallback = None
+    for size in resolutions:
+        small = cv2.resize(bgr, size, interpolation=cv2.INTER_AREA)
+        img = Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        found = _best_quality(img, budget, max_quality)
+        if found is None:
+            continue
+        data, quality = found
+        if quality >= MIN_USEFUL_QUALITY:
+            return data, size, quality
+        if fallback is None:
+            fallback = (data, size, quality)
+    if fallback is not None:
+        return fallback
+    return encode_webp(img, MIN_QUALITY), resolutions[-1], MIN_QUALITY
@@ -0,0 +1,227 @@
+import threading
+import time
+
+from landing import offset_m
+
+SEVERITY_ORDER = {'critical': 0, 'warning': 1, 'info': 2}
+WATCHDOG_INTERVAL = 1.0     # s between evaluations of time-based rules
+
+
+class Rule:
+    """One alert condition, evaluated from the packet just received and O(1) state.
+
+    evaluate() returns [(key, condition, message)] for the ports it has an
+    opinion on; poll() does the same for time-based conditions. The engine
+    raises an alert once the condition has held for debounce seconds and
+    clears it once it has been false for clear_after seconds.
+    """
+
+    name = "rule"
+    severity = "warning"
+    headers = ()
+    timed = False
+
+    def __init__(self, debounce=0.0, clear_after=5.0):
+        self.debounce = debounce
+        self.clear_after = clear_after
+
+    def evaluate(self, header, port, value, now):
+        return []
+
+    def poll(self, now):
+        return []
+
+
+class RssiBelow(Rule):
+    name = "rssi_low"
+    headers = ("RS",)
+
+    def __init__(self, threshold, duration):
+        super().__init__(debounce=duration)
+        self.threshold = threshold
+
+    def evaluate(self, header, port, value, now):
+        return [(port, value < self.threshold, f"Port {port} RSSI {value:.0f} dBm below {self.threshold:.0f} dBm")]
+
+
+class PortSilent(Rule):
+    name = "port_silent"
+    severity = "critical"
+    headers = ("packet", "connect", "disconnect")
+    timed = True
+
+    def __init__(self, timeout):
+        super().__init__(clear_after=0.0)
+        self.timeout = timeout
+        self.last_seen = {}     # connected port -> monotonic time of its last packet
+
+    def evaluate(self, header, port, value, now):
+        if header == "disconnect":
+            self.last_seen.pop(port, None)
+        else:
+            self.last_seen[port] = now
+        return [(port, False, "")]
+
+    def poll(self, now):
+        return [(port, now - last > self.timeout, f"No packets on port {port} for {now - last:.0f} s")
+                for port, last in list(self.last_seen.items())]
+
+
+class DescentRate(Rule):
+    name = "descent_rate"
+    severity = "critical"
+    headers = ("GS",)
+
+    def __init__(self, max_rate, duration=5.0):
+        super().__init__(debounce=duration)
+        self.max_rate = max_rate
+        self.last = None    # (lat, lon, alt, t)
+
+    def evaluate(self, header, port, value, now):
+        if self.last is not None and self.last[:3] == value:
+            return []   # same fix relayed by the other port
+        last, self.last = self.last, (*value, now)
+        if last is None or now - last[3] <= 0:
+            return []
+        rate = (last[2] - value[2]) / (now - last[3])
+        return [(None, rate > self.max_rate, f"Descending at {rate:.1f} m/s (limit {self.max_rate:.0f} m/s)")]
+
+
+class GpsJump(Rule):
+    name = "gps_jump"
+    headers = ("GS",)
+
+    def __init__(self, max_speed):
+        super().__init__(clear_after=30.0)
+        self.max_speed = max_speed
+        self.last = None    # (lat, lon, alt, t)
+
+    def evaluate(self, header, port, value, now):
+        if self.last is not None and self.last[:3] == value:
+            return []   # same fix relayed by the other port
+        last, self.last = self.last, (*value, now)
+        if last is None or now - last[3] <= 0:
+            return []
+        east, north = offset_m(last[0], last[1], value[0], value[1])
+        distance = (east ** 2 + north ** 2) ** 0.5
+        speed = distance / (now - last[3])
+        return [(None, speed > self.max_speed, f"GPS jumped {distance:.0f} m ({speed:.0f} m/s)")]
+
+
+class Apogee(Rule):
+    name = "apogee"
+    severity = "info"
+    headers = ("AP",)
+    timed = True
+
+    def __init__(self, hold=60.0):
+        super().__init__(clear_after=0.0)
+        self.hold = hold
+        self.seen = None
+
+    def evaluate(self, header, port, value, now):
+        self.seen = now
+        return [(None, True, f"Apogee detected (port {port})")]
+
+    def poll(self, now):
+        if self.seen is None:
+            return []
+        return [(None, now - self.seen < self.hold, "Apogee detected")]
+
+
+class AlertEngine:
+    """Debounced alerts evaluated incrementally on the ingest stream.
+
+    observe() is called once per packet and only runs the rules registered
+    for that header, so a packet costs O(rules); nothing scans the history
+    deques. A watchdog thread polls the time-based rules (silence, expiry).
+    """
+
+    def __init__(self, rules, on_raise=None, on_change=None):
+        self.rules = {rule.name: rule for rule in rules}
+        self.by_header = {}
+        for rule in rules:
+            for header in rule.headers:
+                self.by_header.setdefault(header, []).append(rule)
+        self.timed_rules = [rule for rule in rules if rule.timed]
+        self.on_raise = on_raise
+        self.on_change = on_change
+        self.state = {}     # (rule name, key) -> {'pending', 'clearing', 'active', 'since', 'message'}
+        self.raised = 0
+        self.lock = threading.Lock()
+
+    def observe(self, header, port=None, value=None, now=None):
+        rules = self.by_header.get(header)
+        if not rules:
+            return
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            raised, changed = self._apply(
+                [(rule, result) for rule in rules for result in rule.evaluate(header, port, value, now)], now)
+        self._notify(raised, changed)
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            raised, changed = self._apply(
+                [(rule, result) for rule in self.timed_rules for result in rule.poll(now)], now)
+        self._notify(raised, changed)
+
+    def _apply(self, results, now):
+        """Debounce rule results; called with the lock held. Returns (raised alerts, changed)"""
+        raised = []
+        changed = False
+        for rule, (key, condition, message) in results:
+            entry = self.state.get((rule.name, key))
+            if entry is None:
+                if not condition:
+                    continue
+                entry = self.state[(rule.name, key)] = {
+                    'pending': None, 'clearing': None, 'active': False, 'since': None, 'message': message}
+            if condition:
+                entry['clearing'] = None
+                entry['message'] = message
+                if entry['pending'] is None:
+                    entry['pending'] = now
+                if not entry['active'] and now - entry['pending'] >= rule.debounce:
+                    entry['active'] = True
+                    entry['since'] = time.time()
+                    self.raised += 1
+                    raised.append(self._alert(rule, entry))
+                    changed = True
+            else:
+                entry['pending'] = None
+                if entry['active']:
+                    if entry['clearing'] is None:
+                        entry['clearing'] = now
+                    if now - entry['clearing'] >= rule.clear_after:
+                        entry['active'] = False
+                        changed = True
+        return raised, changed
+
+    def _notify(self, raised, changed):
+        for alert in raised:
+            if self.on_raise:
+                self.on_raise(alert)
+        if changed and self.on_change:
+            self.on_change()
+
+    @staticmethod
+    def _alert(rule, entry):
+        return {'rule': rule.name, 'severity': rule.severity, 'message': entry['message'], 'since': entry['since']}
+
+    def active(self):
+        """Active alerts, most severe first"""
+        with self.lock:
+            alerts = [self._alert(self.rules[name], entry) for (name, key), entry in self.state.items() if entry['active']]
+        return sorted(alerts, key=lambda a: (SEVERITY_ORDER[a['severity']], a['since']))
+
+    def start_watchdog(self, interval=WATCHDOG_INTERVAL):
+        def watchdog():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.tick()
+                except Exception as e:
+                    print(f"Alert watchdog error: {e}")
+        threading.Thread(target=watchdog, daemon=True).start()
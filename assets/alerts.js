@@ -0,0 +1,50 @@
+// Audio cue for new ground station alerts. alert-store carries the running
+// count of raised alerts and the most severe active one; a higher count than
+// last time means something new was raised. Browsers only allow sound after
+// the page has had a click, so the first alerts on an untouched tab are silent.
+(function () {
+    const TONES = {
+        critical: {frequency: 880, beeps: 3},
+        warning: {frequency: 660, beeps: 2},
+        info: {frequency: 520, beeps: 1}
+    };
+    let audio = null;
+    let lastRaised;
+
+    function beep(frequency, beeps) {
+        audio = audio || new (window.AudioContext || window.webkitAudioContext)();
+        for (let i = 0; i < beeps; i++) {
+            const start = audio.currentTime + i * 0.3;
+            const oscillator = audio.createOscillator();
+            const gain = audio.createGain();
+            oscillator.frequency.value = frequency;
+            gain.gain.setValueAtTime(0.2, start);
+            gain.gain.exponentialRampToValueAtTime(0.001, start + 0.2);
+            oscillator.connect(gain).connect(audio.destination);
+            oscillator.start(start);
+            oscillator.stop(start + 0.2);
+        }
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside);
+    window.dash_clientside.balloon = Object.assign({}, window.dash_clientside.balloon, {
+        alertSound: function (data, enabled) {
+            if (!data) {
+                return "";
+            }
+            const previous = lastRaised;
+            lastRaised = data.raised;
+            // no sound for alerts that were already up when the page loaded
+            if (previous === undefined || data.raised <= previous || !enabled || !data.severity) {
+                return "";
+            }
+            const tone = TONES[data.severity];
+            try {
+                beep(tone.frequency, tone.beeps);
+            } catch (e) {
+                console.warn("Alert sound failed", e);
+            }
+            return "";
+        }
+    });
+})();
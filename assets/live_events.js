@@ -0,0 +1,45 @@
+// Push channel for the dashboard: every server-sent event names the topics
+// that changed, and each one is written to its "live-<topic>" dcc.Store, so
+// only the widgets built from those topics refresh. The interval is a slow
+// fallback. The stores render nothing, so the topic list comes from the
+// data-topics attribute of the (hidden) "live-events" div.
+//
+// Each stream holds a server thread, so the server refuses streams past its
+// limit. A refused page polls every data-poll ms and tries the stream again
+// later; once connected the interval goes back to data-refresh.
+(function () {
+    const RECONNECT_MS = 30000;
+
+    function setPollInterval(ms) {
+        window.dash_clientside.set_props("interval-component", {interval: ms});
+    }
+
+    function connect() {
+        const config = document.getElementById("live-events");
+        if (!window.dash_clientside || !window.dash_clientside.set_props || !config) {
+            setTimeout(connect, 200);
+            return;
+        }
+        const known = config.dataset.topics.split(" ");
+        const source = new EventSource("/events");
+        source.onopen = function () {
+            setPollInterval(Number(config.dataset.refresh));
+        };
+        source.onmessage = function (event) {
+            const message = JSON.parse(event.data);
+            message.topics.forEach(function (topic) {
+                if (known.indexOf(topic) >= 0) {
+                    window.dash_clientside.set_props("live-" + topic, {data: message.version});
+                }
+            });
+        };
+        source.onerror = function () {
+            // network errors reconnect by themselves; a refused stream (503) closes
+            if (source.readyState === EventSource.CLOSED) {
+                setPollInterval(Number(config.dataset.poll));
+                setTimeout(connect, RECONNECT_MS);
+            }
+        };
+    }
+    connect();
+})();
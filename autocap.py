@@ -1,107 +1,220 @@
-from picamera2 import Picamera2
-from libcamera import controls
 import time
-import os
-import re
+import queue
+import threading
 import cv2
-import serial
-from PIL import Image
-
-ser = serial.Serial(
-    port='/dev/serial0',
-    baudrate=115200,
-    timeout=1
-)
-time.sleep(2)
-picam = Picamera2(0)
-
-config = picam.create_preview_configuration(
-    main={"size": (1280, 1080), "format": "BGR888"}
-)
-
-def get_next_filename(directory, prefix="image", ext=".jpg"):
-    os.makedirs(directory, exist_ok=True)
-
-    files = os.listdir(directory)
-    numbers = []
-
-    for f in files:
-        match = re.match(rf"{prefix}(\d+){ext}", f)
-        if match:
-            numbers.append(int(match.group(1)))
-
-    next_num = max(numbers) + 1 if numbers else 1
-    return os.path.join(directory, f"{prefix}{next_num}{ext}")
-
-def get_latest_file(directory, ext=".jpg"):
-    files = [
-        os.path.join(directory, f)
-        for f in os.listdir(directory)
-        if f.endswith(ext)
-    ]
-    if not files:
-        return None
-    return max(files, key=os.path.getmtime)
-
 
-save_directory = f'/cam/pictures'
-
-picam.configure(config)
-
-picam.start()
-picam.set_controls({'AfMode': controls.AfModeEnum.Continuous})
-
-print("Picam started.")
-
-capture_timer = time.time()
+from adaptive_encode import encode_thumbnail, encode_to_budget
+from link_quality import LinkBudget, parse_report
+from capture_index import CaptureIndex
+from transmitter import ChunkTransmitter
+from camera_backends import open_cameras
+from serial_backends import open_serial
+from telemetry_codec import CAPABILITY_HEADER, CAPABILITY_VERSION, TelemetryEncoder
+from protocol import sequence_request
+from capture_pipeline import CapturePipeline
+from adaptive_encode import RESOLUTIONS
+from config import config, configure
+
+configure()     # command line settings (--serial-port, --preset, ...) on top of file and environment
+
+# Backends: BALLOON_CAMERA=picamera|stub, BALLOON_SERIAL=pyserial|pty
+# (stub + pty run the whole payload on a normal Linux box, see payload_loadtest.py)
+CAMERA_BACKEND = config.camera
+SERIAL_BACKEND = config.serial_backend
+SERIAL_PORT = config.serial_port
+
+ser = open_serial(SERIAL_BACKEND, SERIAL_PORT, baudrate=config.baudrate, timeout=config.serial_timeout)
+time.sleep(2)
 
-try:
+CAMERA_INDICES = list(config.cameras)
+BURST_SIZE = config.burst_size
+
+save_directory = config.pictures
+capture_index = CaptureIndex(save_directory)
+
+CAPTURE_INTERVAL = config.capture_interval  # s between captures
+GPS_INTERVAL = config.gps_interval          # s between GG queries
+GPS_TIMEOUT = 2                             # s to wait for the GG reply
+ENCODE_RESOLUTIONS = [size for size in RESOLUTIONS if size[0] <= config.encode_max_size] or RESOLUTIONS[-1:]
+link_budget = LinkBudget(window=CAPTURE_INTERVAL)  # one image must downlink within a capture interval
+
+# Most recent capture and its pre-encoded WEBP, kept in RAM so PACKET_PLEASE
+# never waits on the SD card
+BUDGET_TOLERANCE = 0.1  # reuse the pre-encoded WEBP if its budget is this close
+latest_frame = None     # (jpg_path, BGR array, (lat, lon, alt) at capture)
+latest_webp = None      # {'path', 'data', 'thumbnail', 'budget', 'size', 'quality'}
+frame_lock = threading.Lock()
+disk_queue = queue.Queue()
+
+# The serial reader only dispatches lines; each consumer runs in its own thread
+request_queue = queue.Queue()   # PACKET_PLEASE budgets
+gps_queue = queue.Queue()       # raw GG replies
+write_lock = threading.Lock()
+latest_gps = ('', '', '')
+# Compact TZ telemetry once the ground station has announced it with TC:2
+telemetry_compact = False
+telemetry_encoder = TelemetryEncoder()
+stop_event = threading.Event()
+
+def disk_writer():
+    """Background SD card writes: bytes are written as-is, arrays as JPG"""
     while True:
+        path, data = disk_queue.get()
+        try:
+            if isinstance(data, bytes):
+                with open(path, 'wb') as f:
+                    f.write(data)
+            else:
+                cv2.imwrite(path, data)
+        except Exception as e:
+            print(f"Failed to write {path}: {e}")
+
+def encode_frame(jpg_path, frame, budget):
+    global latest_webp
+    # the thumbnail comes out of the same byte budget
+    thumbnail = encode_thumbnail(frame, config.chunk_size) if config.thumbnail else None
+    data, size, quality = encode_to_budget(frame, budget - len(thumbnail or b""), ENCODE_RESOLUTIONS,
+                                           config.encode_max_quality)
+    webp_path = capture_index.next_filename("image", ".webp")
+    encoded = {'path': webp_path, 'data': data, 'thumbnail': thumbnail, 'budget': budget, 'size': size,
+               'quality': quality}
+    with frame_lock:
+        if latest_frame is not None and latest_frame[0] != jpg_path:
+            return encoded  # a newer capture superseded this one
+        latest_webp = encoded
+    disk_queue.put((webp_path, data))
+    capture_index.add(webp_path)
+    t = time.localtime()
+    c = time.strftime("%H:%M:%S", t)
+    with open('image_log.txt', 'a') as l:
+        l.write(f"{webp_path} generated from {jpg_path} at {c} ({size[0]}x{size[1]} q{quality}, budget {budget})\n")
+    return encoded
+
+def serial_write(data):
+    with write_lock:
+        ser.write(data)
+
+FEC = config.fec  # (k data chunks, m parity chunks) or None
+transmitter = ChunkTransmitter(serial_write, chunk_size=config.chunk_size, air_rate=config.air_rate,
+                               radio_buffer=config.radio_buffer, fec=FEC)
+
+def serial_reader():
+    """Read lines from the radio and hand them to the thread that owns them"""
+    global telemetry_compact
+    while not stop_event.is_set():
         line_read = ser.readline()
-        if capture_timer > 60:
-            jpg_path = get_next_filename(save_directory, "image", ".jpg")
-            picam.capture_file(jpg_path)
-
-            ser.write("GG")
-            time.sleep(1)
-            line_gps = ser.readline()
-            if line_gps:
-                decoded_line = line_gps.decode('utf-8').strip()
-            gps_line = decoded_line.strip().split(',')
-            lat = gps_line[0]
-            lon = gps_line[1]
-            alt = gps_line[2]
-            t = time.localtime()
-            c = time.strftime("%H:%M:%S", t)
-            with open('image_log.txt', 'a') as l:
-                l.write(f"{jpg_path} saved at : {c}\nGPS position at : lat [{lat}], lon [{lon}], alt [{alt}]")
-            capture_timer = time.time()
-        if line_read.decode('utf-8').strip() == "PACKET_PLEASE":
-            latest_jpg = get_latest_file(save_directory, ".jpg")
+        if not line_read:
+            continue
+        command = line_read.decode('utf-8', errors='replace').strip()
+        report = parse_report(command)
+        if report is not None:
+            link_budget.update(*report)
+        elif command.startswith(CAPABILITY_HEADER + ":"):
+            telemetry_compact = command[len(CAPABILITY_HEADER) + 1:] == CAPABILITY_VERSION
+        elif command == sequence_request().strip():
+            transmitter.sequence = True
+        elif command.startswith("PACKET_PLEASE"):
+            # "PACKET_PLEASE:<bytes>" overrides the budget derived from link reports
+            _, _, requested = command.partition(":")
+            request_queue.put(int(requested) if requested.isdigit() else None)
+        elif command.count(',') == 2:
+            gps_queue.put(command)
+
+def gps_poller():
+    """Keep latest_gps fresh so captures never wait on a GG round trip"""
+    global latest_gps
+    while not stop_event.is_set():
+        serial_write(b"GG")
+        try:
+            gps_line = gps_queue.get(timeout=GPS_TIMEOUT).split(',')
+            latest_gps = (gps_line[0], gps_line[1], gps_line[2])
+            if telemetry_compact:
+                telemetry_encoder.gps(*latest_gps)
+                transmitter.send_line(telemetry_encoder.flush())
+            else:
+                transmitter.send_telemetry("GS", ",".join(latest_gps))
+        except queue.Empty:
+            print("No GPS reply")
+        except ValueError as e:
+            print(f"Bad GPS reply: {e}")
+        stop_event.wait(GPS_INTERVAL)
+
+def capture_loop():
+    global latest_frame, latest_webp
+    next_capture = time.monotonic()
+    while not stop_event.is_set():
+        jpg_path = capture_index.next_filename("image", ".jpg")
+        camera_index, frame, scores = pipeline.capture_best()
+        lat, lon, alt = latest_gps
+        with frame_lock:
+            latest_frame = (jpg_path, frame, (lat, lon, alt))
+            latest_webp = None
+        disk_queue.put((jpg_path, frame))
+        threading.Thread(target=encode_frame, args=(jpg_path, frame, link_budget.budget()), daemon=True).start()
+
+        t = time.localtime()
+        c = time.strftime("%H:%M:%S", t)
+        with open('image_log.txt', 'a') as l:
+            l.write(f"{jpg_path} saved at : {c} (camera {camera_index}, best of burst, score {scores['score']:.2f})\n"
+                    f"GPS position at : lat [{lat}], lon [{lon}], alt [{alt}]\n")
+        capture_index.add(jpg_path, lat, lon, alt)
+
+        next_capture += CAPTURE_INTERVAL
+        stop_event.wait(max(0, next_capture - time.monotonic()))
+
+def command_server():
+    """Answer PACKET_PLEASE from RAM, independent of the camera and GPS threads"""
+    global latest_frame
+    while not stop_event.is_set():
+        try:
+            requested = request_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        budget = requested if requested is not None else link_budget.budget()
+        with frame_lock:
+            frame = latest_frame
+            encoded = latest_webp
+        if frame is None:
+            # Cold start: nothing captured since boot, fall back to the newest JPG on disk
+            latest_jpg = capture_index.latest_record(".jpg")
             if latest_jpg is None:
                 print("No JPG available yet")
                 continue
-
-            webp_path = get_next_filename(save_directory, "image", ".webp")
-            img = cv2.imread(latest_jpg)
+            img = cv2.imread(latest_jpg['path'])
             if img is None:
                 print("Failed to load JPG")
                 continue
-            small = cv2.resize(img, (240, 240), interpolation=cv2.INTER_AREA)
-            pil_img = Image.fromarray(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
-            pil_img.save(webp_path, "WEBP", quality=25)
-
-            t = time.localtime()
-            c = time.strftime("%H:%M:%S", t)
-            with open('image_log.txt', 'a') as l:
-                l.write(f"{webp_path} generated from {latest_jpg} at {c}\n")
-            with open(webp_path, 'rb') as f:
-                data = f.read()
-            ser.write(data)
-            with open('image_log.txt', 'a') as l:
-                l.write(f"{webp_path} bytes sent: {len(data)}\n")
-        
+            with frame_lock:
+                latest_frame = frame = (latest_jpg['path'], img,
+                                        (latest_jpg['lat'], latest_jpg['lon'], latest_jpg['alt']))
+        if encoded is None or abs(encoded['budget'] - budget) > budget * BUDGET_TOLERANCE:
+            encoded = encode_frame(frame[0], frame[1], budget)
+        webp_path = encoded['path']
+        data = encoded['data']
+        transmitter.send_frame(data, encoded['thumbnail'], frame[2])
+        with open('image_log.txt', 'a') as l:
+            l.write(f"{webp_path} bytes queued for downlink: {len(data)}\n")
+
+pipeline = CapturePipeline(open_cameras(CAMERA_BACKEND, CAMERA_INDICES, config.capture_size), burst=BURST_SIZE)
+
+threads = [
+    threading.Thread(target=disk_writer, daemon=True),
+    threading.Thread(target=serial_reader, daemon=True),
+    threading.Thread(target=gps_poller, daemon=True),
+    threading.Thread(target=capture_loop, daemon=True),
+    threading.Thread(target=command_server, daemon=True),
+    threading.Thread(target=transmitter.run, args=(stop_event,), daemon=True),
+]
+for thread in threads:
+    thread.start()
 
+try:
+    while all(thread.is_alive() for thread in threads):
+        time.sleep(1)
+    print("A payload thread stopped unexpectedly")
+except KeyboardInterrupt:
+    pass
 except Exception as e:
     print(f"An error occurred {e}")
-picam.stop()
+stop_event.set()
+pipeline.close()
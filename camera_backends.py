@@ -0,0 +1,70 @@
+import numpy as np
+
+CAPTURE_SIZE = (1280, 1080)
+
+
+class PicameraCamera:
+    """Picamera2 camera grabbing frames straight from request buffers"""
+
+    def __init__(self, index=0, size=CAPTURE_SIZE):
+        from picamera2 import Picamera2
+        from libcamera import controls
+
+        self.index = index
+        self.picam = Picamera2(index)
+        # picamera2's "RGB888" arrays are [B, G, R] per pixel, i.e. what OpenCV expects
+        config = self.picam.create_preview_configuration(
+            main={"size": size, "format": "RGB888"}
+        )
+        self.picam.configure(config)
+        self.picam.start()
+        self.picam.set_controls({'AfMode': controls.AfModeEnum.Continuous})
+        print(f"Picam {index} started.")
+
+    def capture(self):
+        request = self.picam.capture_request()
+        try:
+            return request.make_array("main")
+        finally:
+            request.release()
+
+    def close(self):
+        self.picam.stop()
+
+
+class StubCamera:
+    """Synthetic sky/ground frames for running the payload without a camera.
+
+    The horizon height, exposure and blur vary from frame to frame so the
+    burst scorer has something to choose between.
+    """
+
+    def __init__(self, index=0, size=CAPTURE_SIZE, seed=None):
+        self.index = index
+        self.width, self.height = size
+        self.rng = np.random.default_rng(seed)
+
+    def capture(self):
+        h, w = self.height, self.width
+        horizon = int(h * self.rng.uniform(0.2, 0.8))
+        gain = self.rng.uniform(0.6, 1.3)
+        frame = np.empty((h, w, 3), dtype=np.float32)
+        rows = np.linspace(0.0, 1.0, horizon, dtype=np.float32)[:, None]
+        frame[:horizon] = np.stack([230 - 60 * rows, 160 - 40 * rows, 90 + 0 * rows], axis=-1)  # B, G, R sky
+        frame[horizon:] = (60, 110, 90)
+        frame[horizon:] += self.rng.normal(0, 25, (h - horizon, w, 1)).astype(np.float32)
+        step = int(self.rng.integers(1, 6))
+        if step > 1:
+            # cheap motion blur stand-in: coarsen the frame
+            frame[:] = np.repeat(np.repeat(frame[::step, ::step], step, 0), step, 1)[:h, :w]
+        return np.clip(frame * gain, 0, 255).astype(np.uint8)
+
+    def close(self):
+        pass
+
+
+def open_cameras(backend, indices, size=CAPTURE_SIZE):
+    """'picamera' for the flight cameras, 'stub' for synthetic frames"""
+    if backend == "stub":
+        return [StubCamera(i, size, seed=i) for i in indices]
+    return [PicameraCamera(i, size) for i in indices]
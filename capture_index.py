@@ -0,0 +1,95 @@
+import os
+import re
+import threading
+import time
+
+MANIFEST_NAME = "index.csv"
+
+
+class CaptureIndex:
+    """Append-only manifest of captured/encoded files in a pictures directory.
+
+    Each line is "seq,path,timestamp,lat,lon,alt". The manifest is replayed
+    once at startup (or rebuilt from a single directory scan if missing), after
+    which next-name and latest lookups are O(1) and never touch the directory.
+    """
+
+    def __init__(self, directory, manifest=MANIFEST_NAME):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.manifest = os.path.join(directory, manifest)
+        self.last_seq = {}      # (prefix, ext) -> highest sequence number used
+        self.latest = {}        # ext -> most recent record
+        self.lock = threading.Lock()
+        if os.path.exists(self.manifest):
+            self._replay()
+        else:
+            self._rebuild()
+
+    @staticmethod
+    def _split(path):
+        match = re.match(r"(.*?)(\d+)(\.\w+)$", os.path.basename(path))
+        if not match:
+            return None
+        return match.group(1), int(match.group(2)), match.group(3)
+
+    def _track(self, record):
+        parts = self._split(record['path'])
+        if parts is None:
+            return
+        prefix, seq, ext = parts
+        key = (prefix, ext)
+        if seq > self.last_seq.get(key, 0):
+            self.last_seq[key] = seq
+        self.latest[ext] = record
+
+    def _replay(self):
+        with open(self.manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split(',')
+                if len(fields) != 6:
+                    continue  # torn last line after a power cut
+                seq, path, timestamp, lat, lon, alt = fields
+                self._track({'seq': int(seq), 'path': path, 'time': float(timestamp),
+                             'lat': lat, 'lon': lon, 'alt': alt})
+
+    def _rebuild(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            parts = self._split(name)
+            if parts is None:
+                continue
+            path = os.path.join(self.directory, name)
+            entries.append((os.path.getmtime(path), parts[1], path))
+        entries.sort()
+        with open(self.manifest, 'a', encoding='utf-8') as f:
+            for mtime, seq, path in entries:
+                f.write(f"{seq},{path},{mtime:.3f},,,\n")
+                self._track({'seq': seq, 'path': path, 'time': mtime, 'lat': '', 'lon': '', 'alt': ''})
+
+    def next_filename(self, prefix="image", ext=".jpg"):
+        """Reserve and return the next path for prefix/ext"""
+        with self.lock:
+            seq = self.last_seq.get((prefix, ext), 0) + 1
+            self.last_seq[(prefix, ext)] = seq
+        return os.path.join(self.directory, f"{prefix}{seq}{ext}")
+
+    def add(self, path, lat="", lon="", alt="", timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        parts = self._split(path)
+        seq = parts[1] if parts else 0
+        record = {'seq': seq, 'path': path, 'time': timestamp, 'lat': lat, 'lon': lon, 'alt': alt}
+        with self.lock:
+            with open(self.manifest, 'a', encoding='utf-8') as f:
+                f.write(f"{seq},{path},{timestamp:.3f},{lat},{lon},{alt}\n")
+            self._track(record)
+        return record
+
+    def latest_record(self, ext=".jpg"):
+        """Most recent record for ext ({'seq', 'path', 'time', 'lat', 'lon', 'alt'}), or None"""
+        return self.latest.get(ext)
+
+    def latest_file(self, ext=".jpg"):
+        record = self.latest_record(ext)
+        return record['path'] if record else None
@@ -0,0 +1,56 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+BURST_SIZE = 3          # frames per camera per capture
+SCORE_WORKERS = 2
+SCORE_SIZE = (320, 270)  # frames are scored on a downscaled copy
+
+
+def score_frame(bgr):
+    """Usefulness of a frame: sharpness x exposure x sky/ground composition"""
+    small = cv2.resize(bgr, SCORE_SIZE, interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    brightness = gray.mean() / 255.0
+    clipped = ((gray < 8) | (gray > 247)).mean()
+    exposure = max(0.0, 1.0 - abs(brightness - 0.45) * 2) * (1.0 - clipped)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    sky = ((hsv[..., 0] > 90) & (hsv[..., 0] < 130) & (hsv[..., 2] > 120)).mean()
+    # frames showing both sky and ground are worth more than all-sky or all-ground
+    composition = 0.5 + min(sky, 1.0 - sky)
+    return {
+        'sharpness': float(sharpness),
+        'exposure': float(exposure),
+        'sky': float(sky),
+        'score': math.log1p(sharpness) * exposure * composition,
+    }
+
+
+class CapturePipeline:
+    """Burst capture across one or more cameras, keeping only the best frame.
+
+    Frames are grabbed into memory and scored in a worker pool while the next
+    frames of the burst are being captured.
+    """
+
+    def __init__(self, cameras, burst=BURST_SIZE, workers=SCORE_WORKERS):
+        self.cameras = cameras
+        self.burst = burst
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def capture_best(self):
+        """Returns (camera_index, frame, scores) of the best frame in the burst"""
+        candidates = []
+        for camera in self.cameras:
+            for _ in range(self.burst):
+                frame = camera.capture()
+                candidates.append((camera.index, frame, self.pool.submit(score_frame, frame)))
+        camera_index, frame, scored = max(candidates, key=lambda c: c[2].result()['score'])
+        return camera_index, frame, scored.result()
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        for camera in self.cameras:
+            camera.close()
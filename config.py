@@ -0,0 +1,247 @@
+import argparse
+import configparser
+import os
+import sys
+
+CONFIG_FILE = "balloon.ini"
+SECTION = "balloon"
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_size(value):
+    """"1280x1080" -> (1280, 1080)"""
+    if isinstance(value, tuple):
+        return value
+    width, _, height = str(value).lower().partition("x")
+    return int(width), int(height)
+
+
+def parse_indices(value):
+    """"0,1" -> (0, 1)"""
+    if isinstance(value, tuple):
+        return value
+    indices = tuple(int(v) for v in str(value).split(",") if v.strip())
+    if not indices:
+        raise ValueError("no camera index given")
+    return indices
+
+
+def parse_fec(value):
+    """"8,2" -> (8, 2); "off" -> None"""
+    if value is None or isinstance(value, tuple):
+        return value
+    if str(value).strip().lower() in ("", "off", "none", "0"):
+        return None
+    k, m = (int(v) for v in str(value).split(","))
+    if k < 1 or m < 1 or k + m > 256:
+        raise ValueError("need k >= 1, m >= 1 and k + m <= 256")
+    return k, m
+
+
+def parse_optional_float(value):
+    """"" or "auto" -> None"""
+    if value is None or isinstance(value, float):
+        return value
+    if str(value).strip().lower() in ("", "auto", "none"):
+        return None
+    return float(value)
+
+
+# name -> (type, default, environment variable, help)
+SETTINGS = {
+    # ground station link
+    'port1': (str, "COM11", "BALLOON_PORT1", "Serial port of the first ground radio"),
+    'port2': (str, "COM12", "BALLOON_PORT2", "Serial port of the second ground radio"),
+    'baudrate': (int, 115200, "BALLOON_BAUDRATE", "Radio serial baud rate (ground and payload)"),
+    'serial_timeout': (float, 1.0, "BALLOON_SERIAL_TIMEOUT", "Serial read timeout in seconds"),
+    # ground station buffers and dashboard
+    'log_history': (int, 500, "BALLOON_LOG_HISTORY", "Telemetry log lines kept in memory"),
+    'rssi_history': (int, 100, "BALLOON_RSSI_HISTORY", "RSSI samples kept per port"),
+    'gps_history': (int, 100, "BALLOON_GPS_HISTORY", "GPS fixes kept for the track"),
+    'refresh_ms': (int, 10000, "BALLOON_REFRESH_MS", "Dashboard fallback poll period (live events push sooner)"),
+    'host': (str, "0.0.0.0", "BALLOON_HOST", "Dashboard listen address"),
+    'listen_port': (int, 8050, "BALLOON_LISTEN_PORT", "Dashboard listen port"),
+    'serve': (str, "dev", "BALLOON_SERVE", "dev (Flask, debug) or prod (waitress)"),
+    'wsgi_threads': (int, 16, "BALLOON_WSGI_THREADS", "waitress threads in prod mode"),
+    'event_streams': (int, 8, "BALLOON_EVENT_STREAMS",
+                      "Live event streams served at once (each holds a thread); further dashboards poll"),
+    'profiling': (parse_bool, False, "BALLOON_PROFILE", "Enable stage timers at startup"),
+    'archive': (str, "flights", "BALLOON_ARCHIVE", "Root directory of the per-flight frame archive"),
+    'session': (str, "", "BALLOON_SESSION",
+                "Flight session under the archive root (default: resume a recent one, else start a new one)"),
+    'resume': (parse_bool, True, "BALLOON_RESUME", "Continue a session whose journal was written recently"),
+    'mbtiles': (str, "tiles.mbtiles", "BALLOON_MBTILES", "Offline map tiles"),
+    'leaflet_dir': (str, "leaflet", "BALLOON_LEAFLET_DIR", "Local Leaflet assets"),
+    'ground_alt': (parse_optional_float, None, "BALLOON_GROUND_ALT",
+                   "Landing site elevation in m for the landing prediction (auto: the launch pad fixes)"),
+    # ground station alerts
+    'alert_rssi_dbm': (float, -95.0, "BALLOON_ALERT_RSSI_DBM", "Alert when a port's RSSI stays below this"),
+    'alert_rssi_seconds': (float, 10.0, "BALLOON_ALERT_RSSI_SECONDS", "... for this many seconds"),
+    'alert_silence_seconds': (float, 30.0, "BALLOON_ALERT_SILENCE_SECONDS",
+                              "Alert when a connected port receives nothing for this long"),
+    'alert_descent_rate': (float, 20.0, "BALLOON_ALERT_DESCENT_RATE", "Alert above this descent rate, m/s"),
+    'alert_gps_jump': (float, 150.0, "BALLOON_ALERT_GPS_JUMP",
+                       "Alert when consecutive fixes imply more than this ground speed, m/s"),
+    # payload
+    'serial_port': (str, "/dev/serial0", "BALLOON_SERIAL_PORT", "Payload radio serial port"),
+    'serial_backend': (str, "pyserial", "BALLOON_SERIAL", "pyserial or pty"),
+    'camera': (str, "picamera", "BALLOON_CAMERA", "picamera or stub"),
+    'cameras': (parse_indices, (0,), "BALLOON_CAMERAS", "Camera indices to capture from, e.g. 0,1"),
+    'pictures': (str, "/cam/pictures", "BALLOON_PICTURES", "Payload capture directory"),
+    'capture_size': (parse_size, (1280, 1080), "BALLOON_CAPTURE_SIZE", "Camera capture size, WxH"),
+    'capture_interval': (float, 60.0, "BALLOON_CAPTURE_INTERVAL", "Seconds between captures"),
+    'gps_interval': (float, 10.0, "BALLOON_GPS_INTERVAL", "Seconds between GPS queries"),
+    'burst_size': (int, 3, "BALLOON_BURST_SIZE", "Frames per capture burst (sharpest is kept)"),
+    'encode_max_size': (int, 480, "BALLOON_ENCODE_MAX_SIZE", "Largest square downlink resolution"),
+    'encode_max_quality': (int, 90, "BALLOON_ENCODE_MAX_QUALITY", "Highest WebP quality tried"),
+    'chunk_size': (int, 200, "BALLOON_CHUNK_SIZE", "Image bytes per downlink packet"),
+    'thumbnail': (parse_bool, True, "BALLOON_THUMBNAIL",
+                  "Send a one-packet thumbnail ahead of each image for the ground preview"),
+    'air_rate': (int, 1200, "BALLOON_AIR_RATE", "Radio air rate in bytes/s"),
+    'radio_buffer': (int, 512, "BALLOON_RADIO_BUFFER", "Bytes the radio buffers before dropping"),
+    'fec': (parse_fec, (8, 2), "BALLOON_FEC", "Parity as k,m (up to m lost chunks per group of k are rebuilt) or off"),
+}
+
+# Performance profiles: settings tuned together for one kind of station
+PRESETS = {
+    'default': {},
+    'high-rate': {
+        'log_history': 2000,
+        'rssi_history': 500,
+        'gps_history': 500,
+        'refresh_ms': 2000,
+        'wsgi_threads': 32,
+        'event_streams': 16,
+        'capture_interval': 20.0,
+        'gps_interval': 5.0,
+        'encode_max_size': 480,
+        'encode_max_quality': 90,
+        'chunk_size': 240,
+        'air_rate': 4800,
+        'radio_buffer': 2048,
+        'fec': (16, 2),
+    },
+    'low-power': {
+        'log_history': 200,
+        'rssi_history': 50,
+        'gps_history': 50,
+        'refresh_ms': 30000,
+        'wsgi_threads': 8,
+        'event_streams': 4,
+        'capture_interval': 120.0,
+        'gps_interval': 20.0,
+        'burst_size': 1,
+        'encode_max_size': 240,
+        'encode_max_quality': 75,
+    },
+}
+
+
+class Config:
+    """Resolved settings. Later sources win: defaults, preset, config file, environment, command line.
+
+    The file is INI: keys go in [balloon] (including "preset = <name>"), and
+    extra presets can be defined as [preset:<name>] sections. The command line
+    only counts once an entry point has called configure().
+    """
+
+    def __init__(self, values, sources, preset):
+        self.__dict__.update(values)
+        self.sources = sources
+        self.preset = preset
+
+    def describe(self):
+        return "\n".join(f"{name} = {getattr(self, name)!r}  ({self.sources[name]})" for name in SETTINGS)
+
+
+def _convert(name, value, source):
+    try:
+        return SETTINGS[name][0](value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid value for {name} from {source}: {value!r} ({e})") from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--config", help="INI file (default balloon.ini or BALLOON_CONFIG)")
+    parser.add_argument("--preset", help="Performance profile: " + ", ".join(PRESETS))
+    parser.add_argument("--prod", action="store_const", const="prod", dest="serve", help="Same as --serve prod")
+    parser.add_argument("--profile", action="store_const", const="1", dest="profiling",
+                        help="Same as --profiling 1")
+    parser.add_argument("--show-config", action="store_true", help="Print the resolved settings")
+    for name, (_, _, _, help_text) in SETTINGS.items():
+        if name in ("serve", "profiling"):
+            parser.add_argument("--" + name, dest=name, help=help_text)
+        else:
+            parser.add_argument("--" + name.replace("_", "-"), dest=name, help=help_text)
+    return parser
+
+
+def load(argv=(), environ=None):
+    """Resolve the settings; argv is the command line to apply (none by default)"""
+    environ = os.environ if environ is None else environ
+    args, _ = build_parser().parse_known_args(argv)
+
+    path = args.config or environ.get("BALLOON_CONFIG", CONFIG_FILE)
+    parser = configparser.ConfigParser()
+    if args.config and not os.path.exists(path):
+        raise FileNotFoundError(f"Config file not found: {path}")
+    parser.read(path, encoding="utf-8")
+    file_values = dict(parser[SECTION]) if parser.has_section(SECTION) else {}
+    presets = dict(PRESETS)
+    for section in parser.sections():
+        if section.startswith("preset:"):
+            presets[section[len("preset:"):]] = dict(parser[section])
+
+    preset = args.preset or environ.get("BALLOON_PRESET") or file_values.pop("preset", None) or "default"
+    file_values.pop("preset", None)
+    if preset not in presets:
+        raise ValueError(f"Unknown preset {preset!r}, choose from {', '.join(presets)}")
+
+    values = {}
+    sources = {}
+    layers = [
+        ("default", {name: spec[1] for name, spec in SETTINGS.items()}),
+        (f"preset {preset}", presets[preset]),
+        (path, file_values),
+        ("environment", {name: environ[spec[2]] for name, spec in SETTINGS.items() if spec[2] in environ}),
+        ("command line", {name: value for name, value in vars(args).items()
+                          if name in SETTINGS and value is not None}),
+    ]
+    for source, layer in layers:
+        for name, value in layer.items():
+            if name not in SETTINGS:
+                raise ValueError(f"Unknown setting {name!r} in {source}")
+            values[name] = _convert(name, value, source)
+            sources[name] = source
+
+    return Config(values, sources, preset)
+
+
+def configure(argv=None):
+    """Apply the command line (default sys.argv) to the shared config.
+
+    Entry points call this before importing the modules that read settings at
+    import time; plain imports only see defaults, preset, file and environment.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    resolved = load(argv)
+    config.__dict__.update(resolved.__dict__)
+    args, _ = build_parser().parse_known_args(argv)
+    if args.show_config:
+        print(f"preset = {config.preset!r}")
+        print(config.describe())
+    return config
+
+
+config = load()
@@ -0,0 +1,135 @@
+import math
+from functools import lru_cache
+
+# Systematic Reed-Solomon erasure code over GF(256) for image chunks. Each
+# group of k data chunks gets m parity chunks, and any k of the k+m chunks of
+# a group rebuild it: up to m lost chunks per group are recovered whatever
+# their positions (a burst of m consecutive chunks included).
+#
+# Parity j of a group is sum_i C[j][i] * chunk_i over the group's chunks
+# (zero-padded to the chunk size), with the Cauchy matrix
+# C[j][i] = 1 / ((k + j) xor i); every square submatrix of it is invertible,
+# so the missing chunks are the solution of a small linear system.
+#
+# Parity packets are framed like data chunks, with PR instead of PL:
+#   "PR:<group>,<j>,<k>,<m>,<frame bytes>,<chunk size>\n"
+PARITY_HEADER = "PR"
+MAX_GROUP = 256     # k + m: GF(256) has that many distinct Cauchy points
+GF_POLY = 0x11d
+
+
+def _gf_tables():
+    exp = [0] * 510
+    log = [0] * 256
+    x = 1
+    for i in range(255):
+        exp[i] = exp[i + 255] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= GF_POLY
+    return exp, log
+
+
+_EXP, _LOG = _gf_tables()
+
+
+def gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+
+def gf_inv(a):
+    return _EXP[255 - _LOG[a]]
+
+
+@lru_cache(maxsize=None)
+def _mul_table(c):
+    """bytes.translate table multiplying every byte by c"""
+    return bytes(gf_mul(c, v) for v in range(256))
+
+
+def _combine(terms, size):
+    """sum of c * chunk over (c, chunk) terms, chunks zero-padded to size"""
+    acc = 0
+    for c, chunk in terms:
+        chunk = chunk[:size].ljust(size, b"\0")
+        if c != 1:
+            chunk = chunk.translate(_mul_table(c))
+        acc ^= int.from_bytes(chunk, "little")
+    return acc.to_bytes(size, "little")
+
+
+def _coefficient(j, position, k):
+    return gf_inv((k + j) ^ position)
+
+
+def _invert(matrix):
+    """Inverse of a square matrix over GF(256) (Gauss-Jordan)"""
+    n = len(matrix)
+    rows = [list(row) + [int(c == r) for c in range(n)] for r, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = next(r for r in range(col, n) if rows[r][col])
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        scale = gf_inv(rows[col][col])
+        rows[col] = [gf_mul(scale, v) for v in rows[col]]
+        for r in range(n):
+            factor = rows[r][col]
+            if r != col and factor:
+                rows[r] = [v ^ gf_mul(factor, p) for v, p in zip(rows[r], rows[col])]
+    return [row[n:] for row in rows]
+
+
+def _group(group, k, count):
+    start = group * k
+    return range(start, min(start + k, count))
+
+
+def parity_chunks(chunks, k, m, chunk_size):
+    """Yield (group, j, parity) for consecutive groups of k chunks"""
+    for group in range(math.ceil(len(chunks) / k)):
+        members = _group(group, k, len(chunks))
+        for j in range(m):
+            yield group, j, _combine([(_coefficient(j, i - members.start, k), chunks[i]) for i in members],
+                                     chunk_size)
+
+
+def parse_parity(data):
+    """"group,j,k,m,total,size" -> (group, j, (k, m, total, size)); ValueError if it cannot be a parity line"""
+    group, j, k, m, total, chunk_size = (int(v) for v in data.split(','))
+    if min(k, m, chunk_size) <= 0 or k + m > MAX_GROUP or not 0 <= j < m or group < 0 or total < 0:
+        raise ValueError(f"bad parity header {data!r}")
+    return group, j, (k, m, total, chunk_size)
+
+
+def chunk_count(total, chunk_size):
+    """Number of data chunks a frame of total bytes was cut into"""
+    return math.ceil(total / chunk_size)
+
+
+def recover(chunks, parity, k, m, total, chunk_size):
+    """Rebuild missing data chunks. chunks: index -> bytes, parity: (group, j) -> bytes.
+
+    A group is rebuilt when it lost no more chunks than parity chunks of it
+    arrived. Returns index -> bytes for the chunks that could be recovered.
+    """
+    count = chunk_count(total, chunk_size)
+    recovered = {}
+    for group in sorted({group for group, _ in parity}):
+        members = _group(group, k, count)
+        missing = [i for i in members if i not in chunks]
+        rows = sorted(j for g, j in parity if g == group)[:len(missing)]
+        if not missing or len(rows) < len(missing):
+            continue
+        known = [i for i in members if i in chunks]
+        # what the missing chunks contribute to each parity: parity - known chunks' share
+        remainders = [_combine([(1, parity[(group, j)])]
+                               + [(_coefficient(j, i - members.start, k), chunks[i]) for i in known], chunk_size)
+                      for j in rows]
+        inverse = _invert([[_coefficient(j, i - members.start, k) for i in missing] for j in rows])
+        for index, row in zip(missing, inverse):
+            data = _combine(zip(row, remainders), chunk_size)
+            length = total - index * chunk_size if index == count - 1 else chunk_size
+            recovered[index] = data[:length]
+    return recovered
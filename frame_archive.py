@@ -0,0 +1,150 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from config import config
+
+ARCHIVE_ROOT = config.archive
+THUMBNAIL_SIZE = (160, 160)
+ARCHIVE_MAX_AGE = 24 * 3600  # archived frames never change
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    frame INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    thumb_path TEXT,
+    received REAL NOT NULL,
+    lat REAL,
+    lon REAL,
+    alt REAL,
+    size INTEGER,
+    chunks_received INTEGER,
+    chunks_recovered INTEGER,
+    chunks_expected INTEGER,
+    ports TEXT,
+    position TEXT   -- what lat/lon/alt are: "capture" (the payload's fix) or "received" (ground's latest fix)
+);
+CREATE INDEX IF NOT EXISTS frames_received ON frames (received);
+"""
+COLUMNS = ("frame", "path", "thumb_path", "received", "lat", "lon", "alt", "size", "chunks_received",
+           "chunks_recovered", "chunks_expected", "ports", "position")
+
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FrameArchive:
+    """Per-flight frame store: images under <root>/<session>/frames, indexed in archive.db.
+
+    Frame numbers continue from the index, so restarting the ground station
+    in the same session (the session setting) never overwrites earlier frames.
+    Thumbnails are generated once, in a background thread.
+    """
+
+    def __init__(self, root=ARCHIVE_ROOT, session=None):
+        session = session or config.session or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.directory = os.path.join(root, session)
+        self.frames_dir = os.path.join(self.directory, "frames")
+        self.thumbs_dir = os.path.join(self.directory, "thumbs")
+        os.makedirs(self.frames_dir, exist_ok=True)
+        os.makedirs(self.thumbs_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(self.directory, "archive.db"), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(frames)")}
+        if "position" not in existing:
+            # archives written before frames carried their capture fix
+            self.conn.execute("ALTER TABLE frames ADD COLUMN position TEXT")
+        last = self.conn.execute("SELECT MAX(frame) FROM frames").fetchone()[0]
+        self.next_frame = (last or 0) + 1
+        self.thumb_queue = queue.Queue()
+        threading.Thread(target=self._thumbnail_worker, daemon=True).start()
+
+    def add(self, byte_data, lat=None, lon=None, alt=None, position="received", chunks_received=None,
+            chunks_recovered=0, chunks_expected=None, ports=()):
+        """Store one frame and return its record. position says where lat/lon/alt come from."""
+        with self.lock:
+            frame = self.next_frame
+            self.next_frame += 1
+        path = os.path.join(self.frames_dir, f"frame_{frame:05d}.webp")
+        with open(path, "wb") as f:
+            f.write(byte_data)
+        record = {
+            'frame': frame, 'path': path, 'thumb_path': None, 'received': time.time(),
+            'lat': _float_or_none(lat), 'lon': _float_or_none(lon), 'alt': _float_or_none(alt),
+            'size': len(byte_data), 'chunks_received': chunks_received, 'chunks_recovered': chunks_recovered,
+            'chunks_expected': chunks_expected, 'ports': ",".join(str(p) for p in sorted(ports)),
+            'position': position,
+        }
+        with self.lock:
+            self.conn.execute(
+                f"INSERT INTO frames ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)})",
+                record)
+            self.conn.commit()
+        self.thumb_queue.put((frame, path))
+        return record
+
+    def _thumbnail_worker(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            print("Pillow not installed, frame thumbnails disabled")
+            return
+        while True:
+            frame, path = self.thumb_queue.get()
+            thumb_path = os.path.join(self.thumbs_dir, f"frame_{frame:05d}.webp")
+            try:
+                with Image.open(path) as img:
+                    img.thumbnail(THUMBNAIL_SIZE)
+                    img.save(thumb_path, "WEBP", quality=60)
+            except Exception as e:
+                print(f"Thumbnail failed for frame {frame}: {e}")
+                continue
+            with self.lock:
+                self.conn.execute("UPDATE frames SET thumb_path=? WHERE frame=?", (thumb_path, frame))
+                self.conn.commit()
+
+    def latest_frame(self):
+        with self.lock:
+            return self.conn.execute("SELECT MAX(frame) FROM frames").fetchone()[0] or 0
+
+    def page(self, top, limit):
+        """Up to limit records with frame <= top, newest first (keyset pagination on the primary key)"""
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM frames WHERE frame <= ? "
+                "ORDER BY frame DESC LIMIT ?", (top, limit))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def paths(self, frame):
+        """(path, thumb_path) for a frame, or None"""
+        with self.lock:
+            return self.conn.execute("SELECT path, thumb_path FROM frames WHERE frame=?", (frame,)).fetchone()
+
+    def register(self, server):
+        from flask import abort, send_file
+
+        @server.route("/archive/frame/<int:frame>")
+        def archive_frame(frame):
+            paths = self.paths(frame)
+            if paths is None:
+                abort(404)
+            return send_file(os.path.abspath(paths[0]), mimetype="image/webp", max_age=ARCHIVE_MAX_AGE)
+
+        @server.route("/archive/thumb/<int:frame>")
+        def archive_thumb(frame):
+            paths = self.paths(frame)
+            if paths is None:
+                abort(404)
+            # until the background thumbnail exists, the (small) original stands in
+            path = paths[1] or paths[0]
+            return send_file(os.path.abspath(path), mimetype="image/webp",
+                             max_age=ARCHIVE_MAX_AGE if paths[1] else 0)
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+from dash import html, dcc, Input, Output, callback_context
+import dash_bootstrap_components as dbc
+
+PAGE_SIZE = 24
+
+
+def gallery_layout():
+    return dbc.Card([
+        dbc.CardHeader(html.H4("🖼️ Gallery & Timeline")),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Button("Latest", id="gallery-latest", color="primary", size="sm", className="me-2"),
+                    dbc.Button("◀ Newer", id="gallery-newer", color="secondary", size="sm", className="me-2"),
+                    dbc.Button("Older ▶", id="gallery-older", color="secondary", size="sm"),
+                ], width=4),
+                dbc.Col([
+                    dcc.Slider(id="gallery-slider", min=1, max=1, step=1, value=1, marks=None,
+                               tooltip={"placement": "bottom"}, updatemode="mouseup"),
+                ], width=6),
+                dbc.Col([
+                    html.Small(id="gallery-info", className="text-muted"),
+                ], width=2),
+            ], align="center", className="mb-3"),
+            html.Div(id="gallery-grid", style={
+                "display": "flex",
+                "flexWrap": "wrap",
+                "gap": "10px"
+            })
+        ])
+    ], className="mt-4")
+
+
+def _tile(record):
+    received = datetime.fromtimestamp(record['received']).strftime("%H:%M:%S")
+    if record['lat'] is not None and record['lon'] is not None:
+        position = f"{record['lat']:.5f}, {record['lon']:.5f}"
+        if record['position'] != "capture":
+            position += " (at receipt)"
+    else:
+        position = "no GPS"
+    altitude = f"{record['alt']:.0f} m" if record['alt'] is not None else "-- m"
+    complete = f"{record['chunks_received']}/{record['chunks_expected']}"
+    if record['chunks_recovered']:
+        complete += f" (+{record['chunks_recovered']} FEC)"
+    return html.A([
+        # Only the URL travels in the callback payload; the browser fetches
+        # thumbnails for the visible page on its own
+        html.Img(src=f"/archive/thumb/{record['frame']}", style={
+            "width": "160px",
+            "height": "160px",
+            "objectFit": "cover",
+            "borderRadius": "5px",
+            "backgroundColor": "#1a1a1a"
+        }),
+        html.Div(f"#{record['frame']} · {received} · {altitude}", style={"fontSize": "11px"}),
+        html.Div(f"{position} · {complete}", style={"fontSize": "10px", "color": "#888"}),
+    ], href=f"/archive/frame/{record['frame']}", target="_blank",
+       style={"color": "#ddd", "textDecoration": "none", "width": "160px"})
+
+
+def register_gallery(app, archive):
+    @app.callback(
+        Output("gallery-grid", "children"),
+        Output("gallery-info", "children"),
+        Output("gallery-slider", "max"),
+        Output("gallery-slider", "value"),
+        Input("gallery-latest", "n_clicks"),
+        Input("gallery-newer", "n_clicks"),
+        Input("gallery-older", "n_clicks"),
+        Input("gallery-slider", "value"),
+    )
+    def update_gallery(latest_clicks, newer_clicks, older_clicks, top):
+        latest = archive.latest_frame()
+        ctx = callback_context
+        button_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else "gallery-latest"
+
+        if button_id == "gallery-newer":
+            top = min(latest, (top or latest) + PAGE_SIZE)
+        elif button_id == "gallery-older":
+            top = max(min(PAGE_SIZE, latest), (top or latest) - PAGE_SIZE)
+        elif button_id == "gallery-slider" and top:
+            top = min(latest, top)
+        else:
+            top = latest
+
+        if latest == 0:
+            return html.Div("No frames archived yet", style={"color": "#666"}), "", 1, 1
+
+        records = archive.page(top, PAGE_SIZE)
+        info = f"Frames {records[-1]['frame']}–{records[0]['frame']} of {latest}" if records else ""
+        return [_tile(r) for r in records], info, latest, top
@@ -0,0 +1,3 @@
+# Ground station package: ground.station (state, ingest, reassembly; no UI
+# or serial imports), ground.dashboard (Dash app) and ground.cli
+# ("python -m ground [dashboard|ingest|export]").
@@ -0,0 +1,3 @@
+from ground.cli import main
+
+main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import time
+
+import config as config_module
+import track_export
+
+STATS_INTERVAL = 10     # s between headless status lines
+
+
+def run_dashboard(args):
+    # Dash, dbc and the map/gallery modules are only imported here
+    from ground import station
+    from ground.dashboard import create_app
+    from serving import serve
+
+    station.start()
+    serve(create_app())
+
+
+def run_ingest(args):
+    from ground import station
+
+    station.start()
+    ports = {1: config_module.config.port1, 2: config_module.config.port2}
+    for port_num in args.ports:
+        station.connect(port_num, ports[port_num])
+    try:
+        while True:
+            time.sleep(STATS_INTERVAL)
+            print(f"port1 {station.connection_status_port1} {station.packets_received_port1} packets | "
+                  f"port2 {station.connection_status_port2} {station.packets_received_port2} packets | "
+                  f"next frame #{station.frame_count_local}")
+    except KeyboardInterrupt:
+        pass
+    for port_num in args.ports:
+        station.disconnect(port_num)
+
+
+def run_export(args):
+    root = config_module.config.archive
+    session = config_module.config.session
+    if not session:
+        names = os.listdir(root) if os.path.isdir(root) else []
+        sessions = [name for name in names
+                    if os.path.exists(os.path.join(root, name, track_export.RECORDING_NAME))]
+        if not sessions:
+            sys.exit(f"No track recordings under {root}")
+        session = max(sessions, key=lambda name: os.path.getmtime(os.path.join(root, name)))
+    recording = os.path.join(root, session, track_export.RECORDING_NAME)
+    output = args.output or f"{session}.{args.format}"
+    start = time.perf_counter()
+    with open(output, "w", encoding="utf-8", newline="") as out:
+        track_export.export(args.format, lambda: track_export.read_recording(recording), out, name=session)
+    print(f"Wrote {output} in {time.perf_counter() - start:.2f} s")
+
+
+def build_parser():
+    # Settings flags (--port1, --preset, --prod, ...) are resolved by config.py;
+    # they are declared here too so they are accepted before or after the command.
+    # Modules that read settings at import time (ground.station, ...) are only
+    # imported by the run_* functions, after main() has applied the command line
+    common = config_module.build_parser()
+    parser = argparse.ArgumentParser(prog="python -m ground", parents=[common], allow_abbrev=False,
+                                     description="Dual port balloon ground station")
+    commands = parser.add_subparsers(dest="command")
+    dashboard = commands.add_parser("dashboard", parents=[common], allow_abbrev=False,
+                                    help="Ingest and serve the dashboard (default)")
+    dashboard.set_defaults(run=run_dashboard)
+    ingest = commands.add_parser("ingest", parents=[common], allow_abbrev=False,
+                                 help="Headless ingest and archiving, no UI")
+    ingest.add_argument("ports", nargs="*", type=int, choices=(1, 2), default=[1, 2],
+                        help="Ports to connect (default both)")
+    ingest.set_defaults(run=run_ingest)
+    export = commands.add_parser("export", parents=[common], allow_abbrev=False,
+                                  help="Export a recorded flight track")
+    export.add_argument("format", choices=sorted(track_export.EXPORTERS))
+    export.add_argument("-o", "--output", help="Output file (default <session>.<format>)")
+    export.set_defaults(run=run_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config_module.configure(argv)
+    getattr(args, "run", run_dashboard)(args)
@@ -0,0 +1,513 @@
+import os
+import base64
+from datetime import datetime
+
+from dash import Dash, html, dcc, Input, Output, State, Patch, callback_context, no_update, ClientsideFunction
+import dash_bootstrap_components as dbc
+
+from landing import ellipse_points
+from offline_map import LEAFLET_MISSING, tile_cache, map_html, message_html
+from live_events import live_events
+from render_cache import RenderCache, ResponseCache
+import metrics
+from profiling import profiler
+from gallery import gallery_layout, register_gallery
+import track_export
+from config import config
+from ground import station
+
+# assets/live_events.js lives at the top of the repository, next to the scripts
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# Topics published by ground.station; each has a live-<topic> store bumped by the event stream
+LIVE_TOPICS = ("status", "packets", "image", "log", "rssi", "gps", "alerts")
+FALLBACK_POLL_MS = 2000     # interval while the server has no live stream to spare
+response_cache = ResponseCache(live_events.versions)
+ALERT_COLORS = {'critical': "danger", 'warning': "warning", 'info': "info"}
+
+
+def layout():
+    return dbc.Container([
+        # Updates are pushed over /events into the live-<topic> stores (assets/live_events.js);
+        # the interval is only a slow fallback
+        html.Div(id="live-events", hidden=True, **{
+            "data-topics": " ".join(LIVE_TOPICS), "data-refresh": config.refresh_ms, "data-poll": FALLBACK_POLL_MS}),
+        *[dcc.Store(id=f"live-{topic}") for topic in LIVE_TOPICS],
+        dcc.Store(id="log-cursor"),
+        dcc.Interval(id='interval-component', interval=config.refresh_ms, n_intervals=0),
+
+        dbc.Row([
+            dbc.Col([
+                html.H1("🎈 Dual Port Balloon Ground Station", className="text-center mb-4")
+            ], width=10),
+            dbc.Col([
+                dbc.Switch(id="alert-sound", label="🔔 Alert sounds", value=True),
+            ], width=2, className="d-flex align-items-center")
+        ]),
+
+        # Active alerts; alert-store tells assets/alerts.js when to beep
+        dcc.Store(id='alert-store'),
+        html.Div(id="alert-banners", **{"data-sound": ""}),
+
+        dbc.Card([
+            dbc.CardHeader(html.H5("🔌 Port 1 Connection")),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.InputGroup([
+                            dbc.InputGroupText("COM Port 1"),
+                            dbc.Input(id="port1-input", value=config.port1, type="text"),
+                        ], className="mb-2"),
+                    ], width=3),
+                    dbc.Col([
+                        dbc.Button("Connect Port 1", id="connect1-btn", color="success", className="me-2"),
+                        dbc.Button("Disconnect Port 1", id="disconnect1-btn", color="danger"),
+                    ], width=3),
+                    dbc.Col([
+                        html.Div([
+                            html.H6(id="status1-indicator", className="mb-0"),
+                        ])
+                    ], width=3),
+                    dbc.Col([
+                        html.Div([
+                            html.Small(id="stats1-display", className="text-muted")
+                        ])
+                    ], width=3),
+                ], align="center")
+            ])
+        ], className="mb-3"),
+
+        dbc.Card([
+            dbc.CardHeader(html.H5("🔌 Port 2 Connection")),
+            dbc.CardBody([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.InputGroup([
+                            dbc.InputGroupText("COM Port 2"),
+                            dbc.Input(id="port2-input", value=config.port2, type="text"),
+                        ], className="mb-2"),
+                    ], width=3),
+                    dbc.Col([
+                        dbc.Button("Connect Port 2", id="connect2-btn", color="success", className="me-2"),
+                        dbc.Button("Disconnect Port 2", id="disconnect2-btn", color="danger"),
+                    ], width=3),
+                    dbc.Col([
+                        html.Div([
+                            html.H6(id="status2-indicator", className="mb-0"),
+                        ])
+                    ], width=3),
+                    dbc.Col([
+                        html.Div([
+                            html.Small(id="stats2-display", className="text-muted")
+                        ])
+                    ], width=3),
+                ], align="center")
+            ])
+        ], className="mb-4"),
+        
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("📷 Latest Image")),
+                    dbc.CardBody([
+                        html.Div(id="image-display", style={"textAlign": "center", "minHeight": "400px"}),
+                        html.Hr(),
+                        html.Div(id="image-info", className="text-center text-muted")
+                    ])
+                ], className="mb-3"),
+
+                dbc.Card([
+                    dbc.CardHeader(html.H4("🗺️ GPS Location")),
+                    dbc.CardBody([
+                        html.Iframe(
+                            id="map-frame",
+                            style={
+                                "width": "100%",
+                                "height": "400px",
+                                "border": "none",
+                                "borderRadius": "5px"
+                            }
+                        ),
+                        html.Hr(),
+                        html.Div(id="gps-info", className="text-center text-muted"),
+                        html.Div([
+                            html.Small("Export track: "),
+                            *[html.A(fmt.upper(), href=f"/export/track.{fmt}", className="me-2")
+                              for fmt in track_export.EXPORTERS],
+                            html.A("Google Earth (live)", href="/kml/live.kml"),
+                        ], className="text-center mt-2")
+                    ])
+                ])
+            ], width=8),
+
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H5("📡 Port 1 Signal (RSSI)")),
+                    dbc.CardBody([
+                        html.Div(id="rssi1-display", style={
+                            "textAlign": "center",
+                            "padding": "20px"
+                        })
+                    ])
+                ], className="mb-3"),
+
+                dbc.Card([
+                    dbc.CardHeader(html.H5("📡 Port 2 Signal (RSSI)")),
+                    dbc.CardBody([
+                        html.Div(id="rssi2-display", style={
+                            "textAlign": "center",
+                            "padding": "20px"
+                        })
+                    ])
+                ], className="mb-3"),
+
+                dbc.Card([
+                    dbc.CardHeader(html.H5("📋 Telemetry Log")),
+                    dbc.CardBody([
+                        html.Div(id="telemetry-log", **{"data-dummy": ""}, style={
+                            "maxHeight": "300px",
+                            "overflowY": "scroll",
+                            "fontFamily": "monospace",
+                            "fontSize": "11px",
+                            "backgroundColor": "#1a1a1a",
+                            "padding": "10px",
+                            "borderRadius": "5px"
+                        })
+                    ])
+                ], className="mb-3"),
+
+                dbc.Card([
+                    dbc.CardHeader(html.H5("⏱ Profiler")),
+                    dbc.CardBody([
+                        dbc.Switch(id="profile-switch", label="Stage timers", value=profiler.enabled),
+                        dbc.Button("Dump profile", id="profile-dump-btn", color="secondary", size="sm"),
+                        html.Pre(id="profile-dump", style={
+                            "maxHeight": "300px",
+                            "overflowY": "auto",
+                            "fontSize": "11px",
+                            "color": "#aaa",
+                            "marginTop": "10px"
+                        })
+                    ])
+                ])
+            ], width=4)
+        ]),
+
+        gallery_layout()
+    ], fluid=True, className="p-4")
+
+
+def create_app():
+    """Build the Dash app over the ingest state in ground.station (started here if needed)"""
+    if station.frame_archive is None:
+        station.start()
+
+    app = Dash(__name__, external_stylesheets=[dbc.themes.DARKLY], assets_folder=ASSETS_DIR)
+    tile_cache.register(app.server)
+    if not tile_cache.leaflet_available:
+        station.log("⚠ " + LEAFLET_MISSING.format(dir=tile_cache.leaflet_dir))
+    live_events.register(app.server, max_streams=config.event_streams)
+    response_cache.register(app.server)
+    metrics.register(app.server)
+    station.frame_archive.register(app.server)
+    track_export.register(app.server, station.track_recorder.points,
+                          name=os.path.basename(station.frame_archive.directory))
+    app.layout = layout()
+    register_gallery(app, station.frame_archive)
+
+    @app.callback(
+        Output("profile-dump", "children"),
+        Input("profile-dump-btn", "n_clicks"),
+        Input("profile-switch", "value"),
+        prevent_initial_call=True
+    )
+    def handle_profiler(dump_clicks, enabled):
+        profiler.enabled = bool(enabled)
+        return profiler.dump()
+
+    for port_num in (1, 2):
+        register_connection(app, port_num)
+
+    register_widget(app, "status", ("status", "packets"), [
+        Output("status1-indicator", "children"),
+        Output("status1-indicator", "className"),
+        Output("stats1-display", "children"),
+        Output("status2-indicator", "children"),
+        Output("status2-indicator", "className"),
+        Output("stats2-display", "children"),
+    ], render_status)
+    register_widget(app, "image", ("image",), [
+        Output("image-display", "children"),
+        Output("image-info", "children"),
+    ], render_image)
+    register_widget(app, "rssi", ("rssi",), [
+        Output("rssi1-display", "children"),
+        Output("rssi2-display", "children"),
+    ], render_rssi)
+    register_widget(app, "map", ("gps",), [
+        Output("map-frame", "srcDoc"),
+        Output("gps-info", "children"),
+    ], render_map)
+    register_widget(app, "alerts", ("alerts",), [
+        Output("alert-banners", "children"),
+        Output("alert-store", "data"),
+    ], render_alerts)
+
+    @app.callback(
+        Output("telemetry-log", "children"),
+        Output("log-cursor", "data"),
+        Input("interval-component", "n_intervals"),
+        Input("live-log", "data"),
+        State("log-cursor", "data")
+    )
+    def update_log(n, live, cursor):
+        # Only lines the browser has not seen are sent; they are appended to the log client side
+        with metrics.CALLBACK_SECONDS.time(callback="update_log"):
+            seq, lines, full = station.log_since(cursor['seq'] if cursor else None)
+            if not full and not lines:
+                return no_update, no_update
+            if full or cursor['shown'] + len(lines) > 2 * config.log_history:
+                return [log_entry(line) for line in lines[-config.log_history:]], {
+                    'seq': seq, 'shown': min(len(lines), config.log_history)}
+            patch = Patch()
+            patch.extend([log_entry(line) for line in lines])
+            return patch, {'seq': seq, 'shown': cursor['shown'] + len(lines)}
+
+    app.clientside_callback(
+        """
+        function(children) {
+            const logDiv = document.getElementById("telemetry-log");
+            if (logDiv) {
+                logDiv.scrollTop = logDiv.scrollHeight;
+            }
+            return "";
+        }
+        """,
+        Output("telemetry-log", "data-dummy"),
+        Input("telemetry-log", "children")
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="balloon", function_name="alertSound"),
+        Output("alert-banners", "data-sound"),
+        Input("alert-store", "data"),
+        State("alert-sound", "value")
+    )
+    return app
+
+
+def register_widget(app, name, topics, outputs, render):
+    """Callback refreshing outputs when one of topics changes (or on the fallback interval).
+
+    Every client asking for the same topic versions shares one render, and
+    one serialized response.
+    """
+    cache = RenderCache()
+    response_cache.add([f"{output.component_id}.{output.component_property}" for output in outputs], topics)
+
+    @app.callback(*outputs, Input("interval-component", "n_intervals"),
+                  *[Input(f"live-{topic}", "data") for topic in topics])
+    def update_widget(n, *live):
+        with metrics.CALLBACK_SECONDS.time(callback=name):
+            return cache.get(live_events.versions(topics), render)
+
+
+def register_connection(app, port_num):
+    @app.callback(
+        Output(f"connect{port_num}-btn", "disabled"),
+        Output(f"disconnect{port_num}-btn", "disabled"),
+        Input(f"connect{port_num}-btn", "n_clicks"),
+        Input(f"disconnect{port_num}-btn", "n_clicks"),
+        State(f"port{port_num}-input", "value"),
+        prevent_initial_call=True
+    )
+    def handle_connection(connect_clicks, disconnect_clicks, port):
+        ctx = callback_context
+        if not ctx.triggered:
+            return False, True
+
+        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+
+        if button_id == f"connect{port_num}-btn" and station.connect(port_num, port):
+            return True, False
+        elif button_id == f"disconnect{port_num}-btn" and station.disconnect(port_num):
+            return False, True
+
+        running = station.running1 if port_num == 1 else station.running2
+        return running, not running
+
+
+def render_status():
+    stage = profiler.start()
+
+    if station.connection_status_port1 == "Connected":
+        status1 = html.Span("● Connected", style={"color": "#00ff00"})
+        status1_class = "mb-0"
+    else:
+        status1 = html.Span("● Disconnected", style={"color": "#ff4444"})
+        status1_class = "mb-0"
+
+    stats1 = f"Packets: {station.packets_received_port1}"
+
+    if station.connection_status_port2 == "Connected":
+        status2 = html.Span("● Connected", style={"color": "#00ff00"})
+        status2_class = "mb-0"
+    else:
+        status2 = html.Span("● Disconnected", style={"color": "#ff4444"})
+        status2_class = "mb-0"
+
+    stats2 = f"Packets: {station.packets_received_port2}"
+
+    profiler.stop("dashboard.status", stage)
+    return status1, status1_class, stats1, status2, status2_class, stats2
+
+
+def render_image():
+    stage = profiler.start()
+
+    preview = station.image_preview
+    if preview.image and preview.thumbnail:
+        # a 64 px thumbnail, scaled up to the usual frame size
+        image_display = html.Img(
+            src=f"data:image/webp;base64,{preview.image}",
+            style={"width": "100%", "maxWidth": "480px", "borderRadius": "5px", "opacity": "0.7"}
+        )
+        image_info = f"Receiving frame #{station.frame_count_local} | thumbnail, {len(station.image_data)} chunks so far"
+    elif preview.image:
+        image_display = html.Img(
+            src=f"data:image/webp;base64,{preview.image}",
+            style={"maxWidth": "100%", "maxHeight": "500px", "borderRadius": "5px", "opacity": "0.7"}
+        )
+        image_info = (f"Receiving frame #{station.frame_count_local} | {preview.chunks} chunks, "
+                      f"{preview.size/1024:.1f} KB, {preview.rows}/{preview.height} rows so far")
+    elif station.current_image:
+        image_display = html.Img(
+            src=f"data:image/webp;base64,{station.current_image}",
+            style={"maxWidth": "100%", "maxHeight": "500px", "borderRadius": "5px"}
+        )
+        image_info = f"Frame #{station.frame_count_local - 1} | {len(base64.b64decode(station.current_image))/1024:.1f} KB"
+    else:
+        image_display = html.Div(
+            "No image received yet",
+            style={"padding": "100px", "color": "#666"}
+        )
+        image_info = "Waiting for data..."
+
+    profiler.stop("dashboard.image", stage)
+    return image_display, image_info
+
+
+def log_entry(line):
+    return html.Div(line, style={"color": "#00ff00"})
+
+
+def render_rssi():
+    stage = profiler.start()
+
+    if len(station.rssi_history_port1) > 0:
+        current_rssi1 = station.rssi_history_port1[-1]
+        if current_rssi1 > -70:
+            rssi_color1 = "#00ff00"
+        elif current_rssi1 > -85:
+            rssi_color1 = "#ffaa00"
+        else:
+            rssi_color1 = "#ff4444"
+        
+        rssi1_display = html.Div([
+            html.Div(f"{current_rssi1}", style={
+                "fontSize": "36px", 
+                "fontWeight": "bold",
+                "color": rssi_color1
+            }),
+            html.Div("dBm", style={
+                "fontSize": "16px", 
+                "color": "#aaa", 
+                "marginTop": "5px"
+            })
+        ])
+    else:
+        rssi1_display = html.Div([
+            html.Div("--", style={
+                "fontSize": "36px", 
+                "fontWeight": "bold",
+                "color": "#666"
+            }),
+            html.Div("No signal", style={
+                "fontSize": "12px", 
+                "color": "#666", 
+                "marginTop": "5px"
+            })
+        ])
+
+    if len(station.rssi_history_port2) > 0:
+        current_rssi2 = station.rssi_history_port2[-1]
+        if current_rssi2 > -70:
+            rssi_color2 = "#00ff00"
+        elif current_rssi2 > -85:
+            rssi_color2 = "#ffaa00"
+        else:
+            rssi_color2 = "#ff4444"
+        
+        rssi2_display = html.Div([
+            html.Div(f"{current_rssi2}", style={
+                "fontSize": "36px", 
+                "fontWeight": "bold",
+                "color": rssi_color2
+            }),
+            html.Div("dBm", style={
+                "fontSize": "16px", 
+                "color": "#aaa", 
+                "marginTop": "5px"
+            })
+        ])
+    else:
+        rssi2_display = html.Div([
+            html.Div("--", style={
+                "fontSize": "36px", 
+                "fontWeight": "bold",
+                "color": "#666"
+            }),
+            html.Div("No signal", style={
+                "fontSize": "12px", 
+                "color": "#666", 
+                "marginTop": "5px"
+            })
+        ])
+
+    profiler.stop("dashboard.rssi", stage)
+    return rssi1_display, rssi2_display
+
+
+def render_map():
+    stage = profiler.start()
+
+    lat, lon, alt = station.current_lat, station.current_lon, station.current_alt
+    prediction = station.landing_prediction
+    if lat is not None and lon is not None:
+        path = list(station.gps_history) if len(station.gps_history) > 1 else None
+        map_html_doc = map_html(
+            lat, lon, alt, path=path, landing=prediction,
+            ellipse=ellipse_points(prediction) if prediction else None)
+
+        gps_info = f"📍 Lat: {lat:.6f} | Lon: {lon:.6f} | Alt: {alt:.1f}m"
+        if prediction:
+            gps_info += (f" | 🪂 Landing: {prediction['lat']:.5f}, {prediction['lon']:.5f}"
+                         f" in {prediction['time_to_land'] / 60:.1f} min")
+    else:
+        map_html_doc = message_html("No GPS data received yet")
+        gps_info = "Waiting for GPS data..."
+    
+    profiler.stop("dashboard.map", stage)
+    return map_html_doc, gps_info
+
+
+def render_alerts():
+    alerts = station.alert_engine.active()
+    banners = [
+        dbc.Alert(f"{alert['message']} (since {datetime.fromtimestamp(alert['since']):%H:%M:%S})",
+                  color=ALERT_COLORS[alert['severity']], className="mb-2 py-2")
+        for alert in alerts
+    ]
+    alert_state = {'raised': station.alert_engine.raised, 'severity': alerts[0]['severity'] if alerts else None}
+
+    return banners, alert_state
@@ -0,0 +1,584 @@
+# Ground station state, serial ingest and frame reassembly.
+# Importing this module is cheap (no Dash, no serial, nothing written, and
+# settings come from config without parsing the command line):
+# start() opens the session archive and journal, connect() starts a port's
+# ingest thread, and ground.dashboard only reads the state kept here.
+import os
+import time
+import atexit
+import threading
+import base64
+from datetime import datetime
+from collections import deque
+import traceback
+
+from landing import LandingPredictor
+from progressive import ProgressivePreview, libwebp
+from link_quality import FrameStats, format_report
+from protocol import read_packet, parse_packet, SEQUENCE_HEADER, parse_sequence, sequence_request
+from telemetry_codec import COMPACT_HEADER, TelemetryDecoder, capability_line
+from fec import PARITY_HEADER, chunk_count, parse_parity, recover
+from transmitter import THUMBNAIL_HEADER
+from link_timing import SenderClock, SequenceFilter, arrival_datetime, arrival_time
+from live_events import live_events
+import metrics
+from profiling import profiler
+from frame_archive import ARCHIVE_ROOT, FrameArchive
+from state_journal import NullJournal, StateJournal, recent_session
+from track_export import TrackRecorder
+from alerts import AlertEngine, RssiBelow, PortSilent, DescentRate, GpsJump, Apogee
+from config import config
+
+# Global variables for both serial connections
+image_data = {}
+image_parity = {}
+image_fec = None
+image_ports = set()
+frame_count = 0
+packet = b""
+pack_size = 0
+apogee = False
+ser1 = None
+ser2 = None
+running1 = False
+running2 = False
+serial_thread1 = None
+serial_thread2 = None
+frame_archive = None
+frame_count_local = 1
+journal = NullJournal()
+track_recorder = None
+
+packets_received_port1 = 0
+packets_received_port2 = 0
+telemetry_log = deque(maxlen=config.log_history)
+log_seq = 0     # number of lines ever appended to telemetry_log
+log_lock = threading.Lock()
+LOG_QUEUE = metrics.Gauge("balloon_log_queue_depth", "Entries in the telemetry log buffer",
+                          function=lambda: len(telemetry_log))
+rssi_history_port1 = deque(maxlen=config.rssi_history)
+rssi_history_port2 = deque(maxlen=config.rssi_history)
+time_history = deque(maxlen=config.rssi_history)
+current_image = None
+image_preview = ProgressivePreview()
+frame_stats = FrameStats()
+telemetry_decoders = {1: TelemetryDecoder(), 2: TelemetryDecoder()}
+sender_clocks = {1: SenderClock(), 2: SenderClock()}
+sequence_filter = SequenceFilter()
+connection_status_port1 = "Disconnected"
+connection_status_port2 = "Disconnected"
+
+# GPS data
+current_lat = None
+current_lon = None
+current_alt = None
+gps_history = deque(maxlen=config.gps_history)
+landing_predictor = LandingPredictor(ground_alt=config.ground_alt)
+landing_prediction = None
+
+# Data storage for both ports with arrival stamps (time.monotonic_ns()) and sender sequence numbers
+def _buffer_entry():
+    return {'port1': None, 'port2': None, 'time1': None, 'time2': None, 'seq1': None, 'seq2': None}
+
+data_buffer = {header: _buffer_entry() for header in ('FC', 'RS', 'PS', 'IX', 'AP', 'PL', 'GS')}
+
+def start(session=None, resume=True):
+    """Open the frame archive and state journal; a restart within RESUME_WINDOW continues the interrupted session"""
+    global frame_archive, frame_count_local, journal, track_recorder
+    if session is None:
+        session = config.session or (recent_session(ARCHIVE_ROOT) if resume and config.resume else None)
+    frame_archive = FrameArchive(session=session)
+    frame_count_local = frame_archive.next_frame
+    journal = StateJournal(frame_archive.directory)
+    atexit.register(journal.close)
+    track_recorder = TrackRecorder(frame_archive.directory)
+    alert_engine.start_watchdog()
+    restore_session()
+    if libwebp() is None:
+        log("libwebp not found: image previews show the payload thumbnail only, not partial frames")
+
+def restore_session():
+    """Rebuild telemetry state and the partial frame from the session journal"""
+    global frame_count, apogee, image_fec, image_ports, current_lat, current_lon, current_alt
+    global landing_predictor, landing_prediction, log_seq
+    if not journal.resumed:
+        return
+    state = journal.state
+    for lat, lon, alt, t in state.gps:
+        gps_history.append({'lat': float(lat), 'lon': float(lon), 'alt': float(alt), 'time': datetime.fromtimestamp(t)})
+    if state.gps:
+        current_lat, current_lon, current_alt = (float(v) for v in state.gps[-1][:3])
+    for port, value, t in state.rssi:
+        (rssi_history_port1 if port == 1 else rssi_history_port2).append(value)
+        time_history.append(datetime.fromtimestamp(t))
+    with log_lock:
+        telemetry_log.extend(state.log)
+        log_seq += len(state.log)
+    image_data.update(state.chunks)
+    image_parity.update(state.parity)
+    image_fec = state.fec
+    image_ports = set(state.ports)
+    image_preview.offer(image_data)
+    frame_count = state.frame_count
+    apogee = state.apogee
+    # the journal predictor runs on wall-clock time, the live one on time.monotonic()
+    landing_predictor = LandingPredictor.from_dict(state.landing.to_dict(), time.monotonic() - time.time())
+    landing_prediction = landing_predictor.prediction
+    log(f"↻ Resumed session {os.path.basename(frame_archive.directory)}: "
+        f"{len(state.gps)} GPS fixes, {len(image_data)} pending chunks, next frame {frame_count_local}")
+
+def log(message):
+    global log_seq
+    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    with log_lock:
+        telemetry_log.append(f"[{timestamp}] {message}")
+        log_seq += 1
+    journal.log(f"[{timestamp}] {message}")
+    live_events.publish("log")
+    with open("log.txt", "a", encoding="utf-8") as t:
+        t.write(f"[{timestamp}] {message}\n")
+
+def log_since(seq):
+    """(latest seq, lines after seq, full) -- full means seq is too old (or None) and lines is the whole log"""
+    with log_lock:
+        missed = log_seq - seq if seq is not None else None
+        if missed is None or missed > len(telemetry_log):
+            return log_seq, list(telemetry_log), True
+        return log_seq, list(telemetry_log)[len(telemetry_log) - missed:], False
+
+def alert_raised(alert):
+    metrics.ALERTS_RAISED.inc(rule=alert['rule'])
+    log(f"🚨 {alert['message']}")
+
+alert_engine = AlertEngine([
+    RssiBelow(config.alert_rssi_dbm, config.alert_rssi_seconds),
+    PortSilent(config.alert_silence_seconds),
+    DescentRate(config.alert_descent_rate),
+    GpsJump(config.alert_gps_jump),
+    Apogee(),
+], on_raise=alert_raised, on_change=lambda: live_events.publish("alerts"))
+
+def log_image_bytes(header, data, port_num, packet_num=None):
+    """Log image-related bytes to a separate file"""
+    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    with open("image_bytes_log.txt", "a", encoding="utf-8") as img_log:
+        if packet_num is not None:
+            img_log.write(f"[{timestamp}] Port{port_num} {header}: Packet #{packet_num}, {len(data)} bytes\n")
+        else:
+            img_log.write(f"[{timestamp}] Port{port_num} {header}: {len(data)} bytes\n")
+
+def get_best_data(header, port_name, seq=None):
+    """Get data from buffer: the copy of packet seq if a port has it, else the most recent arrival"""
+    buffer = data_buffer.get(header)
+    if not buffer:
+        return None
+
+    if seq is not None:
+        own = port_name[-1]
+        for n in (own, '2' if own == '1' else '1'):
+            if buffer[f'seq{n}'] == seq and buffer[f'port{n}'] is not None:
+                return buffer[f'port{n}']
+
+    port1_data = buffer['port1']
+    port2_data = buffer['port2']
+    time1 = buffer['time1']
+    time2 = buffer['time2']
+    
+    if port1_data is not None and port2_data is not None:
+        if time1 >= time2:
+            log("Using data from Port1 (both available, Port1 newer)")
+            return port1_data
+        else:
+            log("Using data from Port2 (both available, Port2 newer)")
+            return port2_data
+    elif port1_data is not None:
+        log("Using data from Port1 (Port2 unavailable)")
+        return port1_data
+    elif port2_data is not None:
+        log("Using data from Port2 (Port1 unavailable)")
+        return port2_data
+    
+    return None
+
+def update_data_buffer(header, data, port_num, arrival=None, seq=None):
+    if header not in data_buffer:
+        data_buffer[header] = _buffer_entry()
+
+    buffer = data_buffer[header]
+    buffer[f'port{port_num}'] = data
+    buffer[f'time{port_num}'] = time.monotonic_ns() if arrival is None else arrival
+    buffer[f'seq{port_num}'] = seq
+
+def send_uplink(message):
+    """Send a line to the payload over every open port"""
+    for ser in (ser1, ser2):
+        if ser and ser.is_open:
+            try:
+                ser.write(message.encode("ascii"))
+            except Exception as e:
+                log(f"Uplink Error: {e}")
+
+def handle_frame_count(data, port_num, arrival=None):
+    global frame_count
+    # "<frame>[,<chunks>[,<lat>,<lon>,<alt>]]", the position being the capture fix
+    fields = data.split(",")
+    new_frame = int(fields[0])
+    declared = int(fields[1]) if len(fields) > 1 and fields[1] else None
+    position = tuple(float(v) for v in fields[2:5]) if len(fields) >= 5 else None
+    if frame_count != new_frame:
+        frame_count = new_frame
+        journal.record("fc", n=new_frame)
+        save_and_display_image(declared, position)
+
+def handle_rssi(data, port_num, arrival=None):
+    arrival = time.monotonic_ns() if arrival is None else arrival
+    try:
+        rssi_value = float(data)
+        if port_num == 1:
+            rssi_history_port1.append(rssi_value)
+        else:
+            rssi_history_port2.append(rssi_value)
+        time_history.append(arrival_datetime(arrival))
+        journal.rssi(port_num, rssi_value, t=arrival_time(arrival))
+        alert_engine.observe("RS", port_num, rssi_value, now=arrival / 1e9)
+        live_events.publish("rssi")
+    except Exception as e:
+        log(f"Port{port_num} RSSI Error: {e}")
+
+def handle_gps(data, port_num, arrival=None):
+    global current_lat, current_lon, current_alt, landing_prediction
+    arrival = time.monotonic_ns() if arrival is None else arrival
+    try:
+        parts = data.split(',')
+        if len(parts) == 3:
+            lat, lon, alt = parts
+            current_lat = float(lat)
+            current_lon = float(lon)
+            current_alt = float(alt)
+            rssi1 = rssi_history_port1[-1] if rssi_history_port1 else None
+            rssi2 = rssi_history_port2[-1] if rssi_history_port2 else None
+            gps_history.append({
+                'lat': current_lat,
+                'lon': current_lon,
+                'alt': current_alt,
+                'time': arrival_datetime(arrival),
+                'rssi1': rssi1,
+                'rssi2': rssi2
+            })
+            journal.gps(current_lat, current_lon, current_alt, t=arrival_time(arrival))
+            alert_engine.observe("GS", port_num, (current_lat, current_lon, current_alt), now=arrival / 1e9)
+            if track_recorder is not None:
+                track_recorder.add(current_lat, current_lon, current_alt, rssi1, rssi2, t=arrival_time(arrival))
+            landing_prediction = landing_predictor.update(
+                current_lat, current_lon, current_alt, arrival / 1e9)
+            live_events.publish("gps")
+            log(f"📍 GPS: Lat={current_lat}, Lon={current_lon}, Alt={current_alt}m")
+    except Exception as e:
+        log(f"Port{port_num} GPS Error: {e}")
+
+def handle_apogee(data, port_num):
+    global apogee, landing_prediction
+    apogee = True
+    journal.record("apogee")
+    landing_prediction = landing_predictor.mark_apogee()
+    live_events.publish("gps")
+    save_and_display_image()
+    log(f"⚠ APOGEE DETECTED on Port{port_num}!")
+    alert_engine.observe("AP", port_num)
+    log_image_bytes("AP", data, port_num)
+
+TELEMETRY_HANDLERS = {"GS": handle_gps}  # records a TZ payload can carry
+
+def handle_compact(data, port_num, arrival=None, seq=None):
+    """Decode a TZ payload on its port's decoder and handle the records in it.
+
+    Each port's decoder holds the base fix its GPS deltas apply to, so every
+    copy is decoded on its own port. The sequence number is only claimed once
+    a copy decodes to something: if this port lost the base fix, the other
+    port's copy is still handled.
+    """
+    try:
+        items = telemetry_decoders[port_num].decode(data)
+    except Exception as e:
+        metrics.PARSE_ERRORS.inc(port=port_num)
+        log(f"Port{port_num} Telemetry Error: {e}")
+        return
+    if not items:
+        return
+    if seq is not None and not sequence_filter.claim(seq):
+        metrics.DUPLICATES_DROPPED.inc(port=port_num)
+        return
+    for sub_header, sub_data in items:
+        update_data_buffer(sub_header, sub_data, port_num, arrival, seq)
+        TELEMETRY_HANDLERS[sub_header](sub_data, port_num, arrival)
+
+def serial_worker(port, port_num):
+    global ser1, ser2, running1, running2, packet, pack_size, image_fec
+    global packets_received_port1, packets_received_port2, connection_status_port1, connection_status_port2
+    
+    import serial
+
+    running = running1 if port_num == 1 else running2
+    ser = None
+    local_pack_size = 0
+    local_packet = b""
+    local_seq = None    # (seq, sent_ms) from the SQ line opening the current packet
+    last_waiting = None # last SERIAL_BUFFER value, so idle polls do not rewrite the gauge
+    
+    while running:
+        try:
+            ser = serial.Serial(port=port, baudrate=config.baudrate, timeout=config.serial_timeout)
+            ser.reset_input_buffer()
+            if port_num == 1:
+                connection_status_port1 = "Connected"
+                ser1 = ser
+            else:
+                connection_status_port2 = "Connected"
+                ser2 = ser
+            log(f"✓ Port{port_num} Connected to {port}")
+            alert_engine.observe("connect", port_num)
+            live_events.publish("status")
+            # announce compact telemetry and sequence number support to the payload
+            ser.write((capability_line() + sequence_request()).encode("ascii"))
+            break
+        except Exception as e:
+            log(f"✗ Port{port_num} Failed to open {port}: {e}")
+            time.sleep(2)
+            running = running1 if port_num == 1 else running2
+            if not running:
+                return
+            
+    try:
+        while running:
+            running = running1 if port_num == 1 else running2
+            if not running:
+                break
+                
+            waiting = ser.in_waiting
+            if waiting != last_waiting:
+                metrics.SERIAL_BUFFER.set(waiting, port=port_num)
+                last_waiting = waiting
+            if waiting > 0:
+                stage = profiler.start()
+                line = read_packet(ser, local_pack_size)
+                arrival = time.monotonic_ns()
+                stage = profiler.lap("read", stage)
+                metrics.BYTES_RECEIVED.inc(len(line), port=port_num)
+                header, data = parse_packet(line, binary=local_pack_size > 0)
+                stage = profiler.lap("decode", stage)
+                if header == "XX":
+                    metrics.PARSE_ERRORS.inc(port=port_num)
+                elif header == SEQUENCE_HEADER:
+                    try:
+                        local_seq = parse_sequence(data)
+                    except ValueError:
+                        local_seq = None
+                    else:
+                        latency, gap = sender_clocks[port_num].update(*local_seq, arrival)
+                        metrics.LINK_LATENCY.observe(latency, port=port_num)
+                        if gap:
+                            metrics.SEQUENCE_GAPS.inc(gap, port=port_num)
+                    continue
+
+                # PS and IX open a packet; the line after them completes it. The
+                # first port to complete a sequenced packet handles it, the
+                # other port's copy is dropped. TZ copies are claimed by
+                # handle_compact, after they went through the port's decoder.
+                seq = local_seq
+                duplicate = False
+                if header not in ("PS", "IX"):
+                    duplicate = (seq is not None and header not in ("XX", COMPACT_HEADER)
+                                 and not sequence_filter.claim(seq))
+                    local_seq = None
+
+                if local_pack_size > 0:
+                    log(f"Port{port_num} {header}: Binary packet ({len(data)} bytes)")
+                    log_image_bytes(header, data, port_num)
+                    local_pack_size = 0
+                elif isinstance(data, str) and not duplicate and header != COMPACT_HEADER:
+                    log(f"Port{port_num} {header}: {data}")
+
+                update_data_buffer(header, data, port_num, arrival, seq)
+
+                try:
+                    if duplicate:
+                        metrics.DUPLICATES_DROPPED.inc(port=port_num)
+                    elif header == "FC":
+                        handle_frame_count(data, port_num, arrival)
+                    elif header == "PS":
+                        local_pack_size = int(data)
+                        pack_size = local_pack_size
+                    elif header == "IX":
+                        local_packet = data
+                        packet = data
+                        log_image_bytes("IX", data, port_num)
+                    elif header == "AP":
+                        local_packet = data
+                        packet = data
+                        handle_apogee(data, port_num)
+                    elif header == "PL":
+                        packet_num = int(data)
+                        best_packet = get_best_data('IX', f'port{port_num}', seq)
+                        if best_packet is None:
+                            best_packet = local_packet
+                        image_data[packet_num] = best_packet
+                        image_ports.add(port_num)
+                        journal.chunk(packet_num, best_packet, port_num)
+                        if image_preview.offer(image_data):
+                            live_events.publish("image")
+                        frame_stats.chunk(packet_num, len(best_packet))
+                        log_image_bytes("PL", best_packet, port_num, packet_num)
+                    elif header == THUMBNAIL_HEADER:
+                        best_packet = get_best_data('IX', f'port{port_num}', seq)
+                        if best_packet is None:
+                            best_packet = local_packet
+                        if image_preview.offer_thumbnail(best_packet):
+                            live_events.publish("image")
+                    elif header == PARITY_HEADER:
+                        best_packet = get_best_data('IX', f'port{port_num}', seq)
+                        if best_packet is None:
+                            best_packet = local_packet
+                        group, index, image_fec = parse_parity(data)
+                        image_parity[(group, index)] = best_packet
+                        journal.parity(group, index, image_fec, best_packet)
+                    elif header == "RS":
+                        handle_rssi(data, port_num, arrival)
+                    elif header == "GS":
+                        handle_gps(data, port_num, arrival)
+                    elif header == COMPACT_HEADER:
+                        handle_compact(data, port_num, arrival, seq)
+                    else:
+                        print(f"Port{port_num} raw: {data}")
+                except (ValueError, IndexError) as e:
+                    # a corrupted PS/PL/PR/FC line costs that packet, not the port
+                    metrics.PARSE_ERRORS.inc(port=port_num)
+                    log(f"Port{port_num} Bad {header} line: {e}")
+                    continue
+                profiler.stop("handler", stage, header)
+
+                if port_num == 1:
+                    packets_received_port1 += 1
+                else:
+                    packets_received_port2 += 1
+                metrics.PACKETS_RECEIVED.inc(port=port_num)
+                alert_engine.observe("packet", port_num)
+                live_events.publish("packets")
+
+    except Exception as e:
+        log(f"Port{port_num} Error: {e}")
+        traceback.print_exc()
+    finally:
+        if ser and ser.is_open:
+            ser.close()
+        if port_num == 1:
+            running1 = False
+            connection_status_port1 = "Disconnected"
+        else:
+            running2 = False
+            connection_status_port2 = "Disconnected"
+        alert_engine.observe("disconnect", port_num)
+        live_events.publish("status")
+
+def expected_chunks(declared=None):
+    """Chunks in the current frame: the count declared in FC, else the FEC total, else the highest index seen"""
+    if declared:
+        return declared
+    if image_fec is not None:
+        return chunk_count(*image_fec[2:])
+    return max(image_data) + 1
+
+@profiler.timed("save_and_display_image")
+def save_and_display_image(declared=None, position=None):
+    """Reassemble, archive and show the current frame. position is its capture fix
+    (lat, lon, alt) from FC; without one the frame is filed at the latest fix received."""
+    global image_data, image_parity, image_fec, image_ports, frame_count_local, current_image
+    if not image_data:
+        return
+    
+    try:
+        reassembly_start = time.perf_counter()
+        expected = max(expected_chunks(declared), max(image_data) + 1)
+        stats = frame_stats.finish(image_data, expected)
+        chunks_received = len(image_data)
+        metrics.MISSING_CHUNKS.inc(expected - chunks_received)
+
+        # Rebuild lost chunks from parity received on either port
+        recovered = {}
+        if image_fec is not None:
+            recovered = recover(image_data, image_parity, *image_fec)
+            if recovered:
+                image_data.update(recovered)
+                metrics.FEC_RECOVERED.inc(len(recovered))
+                log(f"✓ FEC recovered {len(recovered)} chunk(s): {sorted(recovered)}")
+
+        byte_data = b"".join(image_data[i] for i in sorted(image_data))
+
+        if position is not None:
+            lat, lon, alt = position
+        else:
+            lat, lon, alt = current_lat, current_lon, current_alt
+        record = frame_archive.add(
+            byte_data, lat, lon, alt, position="capture" if position is not None else "received",
+            chunks_received=chunks_received, chunks_recovered=len(recovered),
+            chunks_expected=expected, ports=image_ports)
+        filename = record['path']
+        
+        current_image = base64.b64encode(byte_data).decode()
+        live_events.publish("image")
+        
+        log(f"✓ Saved: {filename} ({len(byte_data)/1024:.1f} KB)")
+        log_image_bytes("SAVE", byte_data, 0)
+        
+        # Report link quality (before FEC) so the payload can size the next image
+        if stats is not None:
+            send_uplink(format_report(*stats))
+
+        metrics.FRAMES_SAVED.inc()
+        metrics.REASSEMBLY_SECONDS.observe(time.perf_counter() - reassembly_start)
+
+        frame_count_local = record['frame'] + 1
+        image_data = {}
+        image_parity = {}
+        image_fec = None
+        image_ports = set()
+        image_preview.clear()
+        journal.record("saved")
+
+    except Exception as e:
+        log(f"Error processing image: {e}")
+
+def connect(port_num, port):
+    """Start the ingest thread for port_num. Returns False if it is already running."""
+    global running1, running2, serial_thread1, serial_thread2
+    if port_num == 1:
+        if running1:
+            return False
+        running1 = True
+        serial_thread1 = threading.Thread(target=serial_worker, args=(port, 1), daemon=True)
+        serial_thread1.start()
+    else:
+        if running2:
+            return False
+        running2 = True
+        serial_thread2 = threading.Thread(target=serial_worker, args=(port, 2), daemon=True)
+        serial_thread2.start()
+    log(f"Port {port_num} Connecting...")
+    return True
+
+def disconnect(port_num):
+    """Stop the ingest thread for port_num. Returns False if it was not running."""
+    global running1, running2
+    if port_num == 1:
+        if not running1:
+            return False
+        running1 = False
+        ser = ser1
+    else:
+        if not running2:
+            return False
+        running2 = False
+        ser = ser2
+    if ser and ser.is_open:
+        ser.close()
+    log(f"Port {port_num} Connection closed by user")
+    return True
@@ -0,0 +1,203 @@
+import math
+import threading
+
+EARTH_RADIUS = 6371000.0
+SCALE_HEIGHT = 7238.0       # m, exponential atmosphere used to scale descent rate
+BAND_SIZE = 500.0           # m, altitude band used for the wind profile
+RATE_SMOOTHING = 0.3        # EMA factor for the vertical rate
+DEFAULT_WIND_SIGMA = 2.0    # m/s, spread assumed for bands with a single sample
+DESCENT_RATE_ERROR = 0.1    # relative error on the time-to-land
+DUPLICATE_WINDOW = 0.5      # s, same fix seen on both ports within this window is ignored
+ASCENT_RATE = 1.0           # m/s, smoothed climb above this means the balloon has launched
+MAX_GROUND_ALT = 5000.0     # m, a stationary fix above this is not taken for the launch site
+PAD_MARGIN = 30.0           # m, climbing or sinking within this of the pad is GPS noise
+PAD_FIXES = 3               # stationary fixes before the pad altitude is trusted
+
+
+def offset_m(lat1, lon1, lat2, lon2):
+    """East/north distance in metres from point 1 to point 2 (equirectangular)"""
+    k = math.pi / 180.0 * EARTH_RADIUS
+    east = (lon2 - lon1) * k * math.cos(math.radians((lat1 + lat2) / 2))
+    north = (lat2 - lat1) * k
+    return east, north
+
+
+def move_m(lat, lon, east, north):
+    k = math.pi / 180.0 * EARTH_RADIUS
+    return lat + north / k, lon + east / (k * math.cos(math.radians(lat)))
+
+
+class LandingPredictor:
+    """Incremental descent and landing prediction from the GPS stream.
+
+    Every fix updates a smoothed vertical rate and the wind estimate of the
+    altitude band it was measured in (running mean/variance, O(1)). Once
+    apogee has been seen the descent is integrated band by band from the
+    current altitude down to the ground, so one update costs at most a few
+    dozen band steps.
+
+    The ground is ground_alt when given. Otherwise it is taken from fixes
+    where the balloon sits still on the pad before launch; a station started
+    mid-flight never sees those and falls back to sea level.
+    """
+
+    def __init__(self, band_size=BAND_SIZE, ground_alt=None):
+        self.band_size = band_size
+        self.ground_alt = ground_alt
+        self.launch_alt = None  # detected from pre-launch fixes when ground_alt is None
+        self.pad = None         # [lowest stationary altitude, fixes] before launch
+        self.launched = False
+        self.bands = {}     # band index -> [n, mean_e, mean_n, m2_e, m2_n]
+        self.last = None    # (lat, lon, alt, t)
+        self.vrate = None
+        self.apogee = False
+        self.prediction = None
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'band_size': self.band_size,
+                'ground_alt': self.ground_alt,
+                'launch_alt': self.launch_alt,
+                'pad': self.pad,
+                'launched': self.launched,
+                'bands': [[band] + stats for band, stats in self.bands.items()],
+                'last': self.last,
+                'vrate': self.vrate,
+                'apogee': self.apogee,
+                'prediction': self.prediction,
+            }
+
+    @classmethod
+    def from_dict(cls, data, time_offset=0.0):
+        """Rebuild from to_dict(); time_offset moves the last fix onto another clock"""
+        predictor = cls(band_size=data['band_size'], ground_alt=data['ground_alt'])
+        predictor.launch_alt = data.get('launch_alt')
+        predictor.pad = data.get('pad')
+        predictor.launched = data.get('launched', True)
+        predictor.bands = {int(b[0]): list(b[1:]) for b in data['bands']}
+        if data['last'] is not None:
+            lat, lon, alt, t = data['last']
+            predictor.last = (lat, lon, alt, t + time_offset)
+        predictor.vrate = data['vrate']
+        predictor.apogee = data['apogee']
+        predictor.prediction = data['prediction']
+        return predictor
+
+    def mark_apogee(self):
+        with self.lock:
+            self.apogee = True
+            if self.last is not None and self.vrate is not None and self.vrate < 0:
+                self.prediction = self._predict()
+            return self.prediction
+
+    def update(self, lat, lon, alt, t):
+        """Feed one fix (t in monotonic seconds). Returns the current prediction or None."""
+        with self.lock:
+            if self.last is not None:
+                plat, plon, palt, pt = self.last
+                dt = t - pt
+                if dt <= 0 or (dt < DUPLICATE_WINDOW and (plat, plon, palt) == (lat, lon, alt)):
+                    return self.prediction
+                east, north = offset_m(plat, plon, lat, lon)
+                self._add_wind((alt + palt) / 2, east / dt, north / dt)
+                rate = (alt - palt) / dt
+                if self.vrate is None:
+                    self.vrate = rate
+                else:
+                    self.vrate += RATE_SMOOTHING * (rate - self.vrate)
+            self._track_launch(alt)
+            self.last = (lat, lon, alt, t)
+            if self.apogee and self.vrate is not None and self.vrate < 0:
+                self.prediction = self._predict()
+            return self.prediction
+
+    def _track_launch(self, alt):
+        """Remember the pad altitude while the balloon is still and low; stop at launch"""
+        if self.launched:
+            return
+        moving = self.vrate is not None and abs(self.vrate) >= ASCENT_RATE
+        if self.apogee or (moving and (self.pad is None or abs(alt - self.pad[0]) > PAD_MARGIN)):
+            self.launched = True
+        elif not moving and alt <= MAX_GROUND_ALT:
+            if self.pad is None:
+                self.pad = [alt, 0]
+            self.pad[0] = min(self.pad[0], alt)
+            self.pad[1] += 1
+            if self.pad[1] >= PAD_FIXES:
+                self.launch_alt = self.pad[0]
+
+    def ground(self):
+        """Altitude the descent is integrated down to"""
+        if self.ground_alt is not None:
+            return self.ground_alt
+        return self.launch_alt if self.launch_alt is not None else 0.0
+
+    def _add_wind(self, alt, ve, vn):
+        band = int(alt // self.band_size)
+        stats = self.bands.get(band)
+        if stats is None:
+            stats = self.bands[band] = [0, 0.0, 0.0, 0.0, 0.0]
+        stats[0] += 1
+        n = stats[0]
+        de = ve - stats[1]
+        dn = vn - stats[2]
+        stats[1] += de / n
+        stats[2] += dn / n
+        stats[3] += de * (ve - stats[1])
+        stats[4] += dn * (vn - stats[2])
+
+    def _wind(self, band):
+        stats = self.bands.get(band)
+        if stats is None:
+            if not self.bands:
+                return 0.0, 0.0, DEFAULT_WIND_SIGMA, DEFAULT_WIND_SIGMA
+            stats = self.bands[min(self.bands, key=lambda b: abs(b - band))]
+        n = stats[0]
+        if n > 1:
+            return stats[1], stats[2], math.sqrt(stats[3] / (n - 1)), math.sqrt(stats[4] / (n - 1))
+        return stats[1], stats[2], DEFAULT_WIND_SIGMA, DEFAULT_WIND_SIGMA
+
+    def _predict(self):
+        lat, lon, alt, _ = self.last
+        descent = -self.vrate
+        bs = self.band_size
+        east = north = var_e = var_n = elapsed = 0.0
+        ground = self.ground()
+        h = alt
+        while h > ground:
+            low = max(ground, (math.ceil(h / bs) - 1) * bs)
+            mid = (h + low) / 2
+            # parachute descent slows as air density rises
+            v = descent * math.exp((mid - alt) / (2 * SCALE_HEIGHT))
+            dt = (h - low) / v
+            we, wn, se, sn = self._wind(int(mid // bs))
+            east += we * dt
+            north += wn * dt
+            var_e += (se * dt) ** 2
+            var_n += (sn * dt) ** 2
+            elapsed += dt
+            h = low
+        var_e += (DESCENT_RATE_ERROR * east) ** 2
+        var_n += (DESCENT_RATE_ERROR * north) ** 2
+        land_lat, land_lon = move_m(lat, lon, east, north)
+        return {
+            'lat': land_lat,
+            'lon': land_lon,
+            'time_to_land': elapsed,
+            'descent_rate': descent,
+            'radius_e': 2 * math.sqrt(var_e),
+            'radius_n': 2 * math.sqrt(var_n),
+        }
+
+
+def ellipse_points(prediction, n=24):
+    """Polygon (lat, lon) of the 2-sigma landing ellipse"""
+    points = []
+    for i in range(n):
+        a = 2 * math.pi * i / n
+        points.append(move_m(prediction['lat'], prediction['lon'],
+                             prediction['radius_e'] * math.cos(a),
+                             prediction['radius_n'] * math.sin(a)))
+    return points
@@ -0,0 +1,87 @@
+import threading
+import time
+
+# Uplink report sent by the ground station after each frame: "LQ:<bytes/s>,<loss>\n"
+LINK_HEADER = "LQ"
+
+DEFAULT_BUDGET = 4000       # bytes per image when no link report has been received
+MIN_BUDGET = 1000
+MAX_BUDGET = 30000
+TRANSMIT_WINDOW = 60.0      # s available to downlink one image (default capture interval)
+BUDGET_MARGIN = 0.8
+REPORT_SMOOTHING = 0.5
+
+
+def format_report(throughput, loss):
+    return f"{LINK_HEADER}:{throughput:.0f},{loss:.3f}\n"
+
+
+def parse_report(text):
+    """Returns (throughput, loss) from an LQ line, or None if it is not one"""
+    if not text.startswith(LINK_HEADER + ":"):
+        return None
+    try:
+        throughput, loss = text[len(LINK_HEADER) + 1:].split(',')
+        return float(throughput), min(max(float(loss), 0.0), 1.0)
+    except ValueError:
+        return None
+
+
+class FrameStats:
+    """Ground side: goodput and chunk loss of the frame being received.
+
+    Each chunk index is counted once, so a chunk relayed by both ports does
+    not double the measured throughput.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.bytes = 0
+        self.indices = set()
+        self.lock = threading.Lock()
+
+    def chunk(self, index, size):
+        with self.lock:
+            if index in self.indices:
+                return
+            if self.started is None:
+                self.started = time.monotonic()
+            self.indices.add(index)
+            self.bytes += size
+
+    def finish(self, image_data, expected):
+        """Returns (throughput, loss) for the frame of expected chunks and resets, or None if no chunk was timed"""
+        with self.lock:
+            started, received = self.started, self.bytes
+            self.started = None
+            self.bytes = 0
+            self.indices = set()
+        if started is None or not image_data:
+            return None
+        elapsed = max(time.monotonic() - started, 1e-3)
+        loss = max(0.0, 1.0 - len(image_data) / expected)
+        return received / elapsed, loss
+
+
+class LinkBudget:
+    """Payload side: turns ground link reports into a per-image byte budget"""
+
+    def __init__(self, configured=DEFAULT_BUDGET, window=TRANSMIT_WINDOW):
+        self.configured = configured
+        self.window = window
+        self.throughput = None
+        self.loss = 0.0
+
+    def update(self, throughput, loss):
+        if self.throughput is None:
+            self.throughput, self.loss = throughput, loss
+        else:
+            self.throughput += REPORT_SMOOTHING * (throughput - self.throughput)
+            self.loss += REPORT_SMOOTHING * (loss - self.loss)
+
+    def budget(self):
+        if self.throughput is None:
+            return self.configured
+        # throughput is goodput (chunks that arrived), so loss is already accounted for
+        budget = self.throughput * self.window * BUDGET_MARGIN
+        return int(min(max(budget, MIN_BUDGET), MAX_BUDGET))
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+MAX_CLOCK_DRIFT = 1e-4      # relative drift allowed between payload and ground clocks
+DEDUP_WINDOW = 4096         # recent sequence numbers remembered for cross-port dedup
+
+# Arrival stamps are time.monotonic_ns() taken right after the read; this pair
+# maps them to wall-clock time for display and recordings
+_WALL_ORIGIN = time.time()
+_MONOTONIC_ORIGIN = time.monotonic_ns()
+
+
+def arrival_time(arrival_ns):
+    """Wall-clock seconds (epoch) for a monotonic arrival stamp"""
+    return _WALL_ORIGIN + (arrival_ns - _MONOTONIC_ORIGIN) / 1e9
+
+
+def arrival_datetime(arrival_ns):
+    return datetime.fromtimestamp(arrival_time(arrival_ns))
+
+
+class SenderClock:
+    """Per-port link timing from sender sequence numbers and timestamps.
+
+    The payload and ground clocks are not synchronised, so latency is
+    measured relative to the fastest packet seen (minimum of arrival minus
+    send time), with that minimum allowed to creep by MAX_CLOCK_DRIFT to
+    follow crystal drift. Gaps in the sequence count packets this port lost.
+    """
+
+    def __init__(self):
+        self.min_offset = None      # ms
+        self.min_arrival = None     # ns, arrival of the packet that set min_offset
+        self.last_seq = None
+
+    def update(self, seq, sent_ms, arrival_ns):
+        """Returns (latency in s, packets missed since the previous one)"""
+        offset = arrival_ns / 1e6 - sent_ms
+        if self.last_seq is not None and seq <= self.last_seq:
+            self.min_offset = None  # payload restarted: new sequence, new clock origin
+        if self.min_offset is None:
+            self.min_offset, self.min_arrival = offset, arrival_ns
+        else:
+            allowed = self.min_offset + MAX_CLOCK_DRIFT * (arrival_ns - self.min_arrival) / 1e6
+            if offset <= allowed:
+                self.min_offset, self.min_arrival = offset, arrival_ns
+        gap = 0
+        if self.last_seq is not None and seq > self.last_seq:
+            gap = seq - self.last_seq - 1
+        self.last_seq = seq
+        return max(0.0, offset - self.min_offset) / 1000, gap
+
+
+class SequenceFilter:
+    """Packets already handled on either port, so the second copy is dropped.
+
+    Keys are (seq, sent_ms): both receivers see the same pair, while a
+    restarted payload reuses sequence numbers with different send times.
+    """
+
+    def __init__(self, window=DEDUP_WINDOW):
+        self.seen = set()
+        self.order = deque()
+        self.window = window
+        self.lock = threading.Lock()
+
+    def claim(self, key):
+        """True for the first port to handle key, False for every later copy"""
+        with self.lock:
+            if key in self.seen:
+                return False
+            self.seen.add(key)
+            self.order.append(key)
+            if len(self.order) > self.window:
+                self.seen.discard(self.order.popleft())
+            return True
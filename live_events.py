@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+MIN_PUSH_INTERVAL = 0.25    # s, events published faster than this are coalesced
+KEEPALIVE_INTERVAL = 15     # s between SSE comments on an idle stream
+# Topics bumped on every packet: they never wake a stream by themselves and
+# ride along with the next event, or go out at most once per THROTTLE_INTERVAL
+THROTTLED_TOPICS = ("packets", "log")
+THROTTLE_INTERVAL = 1.0
+STREAM_RETRY_AFTER = 30     # s, suggested wait for a client refused a stream
+
+
+class EventBroadcaster:
+    """Server-sent events fed directly by the ingest threads.
+
+    publish() only bumps a version counter per topic, so it is cheap enough to
+    call on every packet; each connected client wakes up, sends the topics that
+    changed since its last push as one event, and then waits again. The
+    browser refreshes only the widgets of those topics.
+    """
+
+    def __init__(self, max_streams=None):
+        self.version = 0
+        self.pushed = 0     # version of the last publish that wakes streams
+        self.topic_versions = {}
+        self.cond = threading.Condition()
+        # Each open stream holds a server thread; past max_streams clients are
+        # refused and fall back to polling (assets/live_events.js)
+        self.max_streams = max_streams
+        self.streams = 0
+        self.stream_lock = threading.Lock()
+
+    def publish(self, topic):
+        with self.cond:
+            self.version += 1
+            self.topic_versions[topic] = self.version
+            if topic not in THROTTLED_TOPICS:
+                self.pushed = self.version
+                self.cond.notify_all()
+
+    def versions(self, topics):
+        """Current version of each topic, the cache key of the widgets built from them"""
+        with self.cond:
+            return tuple(self.topic_versions.get(topic, 0) for topic in topics)
+
+    def wait(self, since, timeout):
+        """Block until an unthrottled topic newer than since is published, or timeout.
+
+        Returns (version, changed topics), throttled ones included.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.pushed > since, timeout=timeout)
+            topics = sorted(t for t, v in self.topic_versions.items() if v > since)
+            return self.version, topics
+
+    def stream(self):
+        with self.cond:
+            since = self.version
+        last_sent = time.monotonic()
+        yield "retry: 1000\n\n"
+        while True:
+            version, topics = self.wait(since, THROTTLE_INTERVAL)
+            now = time.monotonic()
+            if not topics:
+                if now - last_sent >= KEEPALIVE_INTERVAL:
+                    last_sent = now
+                    yield ": keepalive\n\n"
+                continue
+            since = version
+            last_sent = now
+            yield f"data: {json.dumps({'version': version, 'topics': topics})}\n\n"
+            time.sleep(MIN_PUSH_INTERVAL)
+
+    def _acquire(self):
+        with self.stream_lock:
+            if self.max_streams is not None and self.streams >= self.max_streams:
+                return False
+            self.streams += 1
+            return True
+
+    def _release(self):
+        with self.stream_lock:
+            self.streams -= 1
+
+    def register(self, server, path="/events", max_streams=None):
+        from flask import Response, stream_with_context
+
+        if max_streams is not None:
+            self.max_streams = max_streams
+
+        @server.route(path)
+        def live_event_stream():
+            if not self._acquire():
+                return Response("Too many live streams, poll instead", status=503,
+                                headers={"Retry-After": str(STREAM_RETRY_AFTER), "Cache-Control": "no-cache"})
+            response = Response(
+                stream_with_context(self.stream()),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+            response.call_on_close(self._release)
+            return response
+
+
+live_events = EventBroadcaster()
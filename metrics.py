@@ -0,0 +1,140 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _labels(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, value in self.samples():
+            lines.append(f"{name}{_labels(self.labelnames, key)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), function=None):
+        super().__init__(name, help_text, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def samples(self):
+        if self.function is not None:
+            return [(self.name, (), self.function())]
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            entries = [(key, list(counts), total, count) for key, (counts, total, count) in self.values.items()]
+        for key, counts, total, count in entries:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _labels(self.labelnames + ("le",), key + (bound,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return "\n".join(lines)
+
+
+registry = []
+
+
+def render_metrics():
+    return "\n".join(metric.render() for metric in registry) + "\n"
+
+
+def register(server, path="/metrics"):
+    from flask import Response
+
+    @server.route(path)
+    def prometheus_metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+# Ground station ingest / reassembly / dashboard metrics
+BYTES_RECEIVED = Counter("balloon_bytes_received_total", "Bytes read from the serial port", ["port"])
+PACKETS_RECEIVED = Counter("balloon_packets_received_total", "Packets parsed", ["port"])
+PARSE_ERRORS = Counter("balloon_parse_errors_total", "Packets with an undecodable header (XX) or corrupted fields", ["port"])
+SERIAL_BUFFER = Gauge("balloon_serial_input_buffer_bytes", "Bytes waiting in the serial input buffer", ["port"])
+FRAMES_SAVED = Counter("balloon_frames_saved_total", "Image frames reassembled and saved")
+MISSING_CHUNKS = Counter("balloon_missing_chunks_total", "Image chunks missing at reassembly, before FEC")
+FEC_RECOVERED = Counter("balloon_fec_recovered_chunks_total", "Image chunks rebuilt from parity")
+REASSEMBLY_SECONDS = Histogram("balloon_frame_reassembly_seconds", "Time to reassemble and save a frame")
+ALERTS_RAISED = Counter("balloon_alerts_raised_total", "Alerts raised", ["rule"])
+LINK_LATENCY = Histogram("balloon_link_latency_seconds", "Packet delay above the fastest seen, from sender timestamps", ["port"],
+                         buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+SEQUENCE_GAPS = Counter("balloon_sequence_gaps_total", "Sender sequence numbers never seen on this port", ["port"])
+DUPLICATES_DROPPED = Counter("balloon_duplicates_dropped_total", "Packets already handled from the other port", ["port"])
+CALLBACK_SECONDS = Histogram("balloon_callback_duration_seconds", "Dash callback duration", ["callback"])
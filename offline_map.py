@@ -0,0 +1,290 @@
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.request
+
+from flask import Response, request, send_from_directory
+
+from config import config
+
+MBTILES_PATH = config.mbtiles
+# leaflet.js / leaflet.css (+ images/), fetched once with "python offline_map.py leaflet"
+LEAFLET_DIR = config.leaflet_dir
+LEAFLET_VERSION = "1.9.4"
+LEAFLET_URL = "https://unpkg.com/leaflet@{version}/dist/{name}"
+LEAFLET_FILES = ("leaflet.js", "leaflet.css", "images/layers.png", "images/layers-2x.png",
+                 "images/marker-icon.png", "images/marker-icon-2x.png", "images/marker-shadow.png")
+TILE_MAX_AGE = 7 * 24 * 3600
+MISSING_TILE_MAX_AGE = 60
+
+TILE_MIMETYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+
+
+class TileCache:
+    """Read-only MBTiles tile store served from the Dash/Flask server.
+
+    Each server thread keeps its own SQLite connection; tiles are served with
+    a long max-age and an ETag derived from the MBTiles file version so the
+    browser only hits the disk once per tile.
+    """
+
+    def __init__(self, path=MBTILES_PATH, leaflet_dir=LEAFLET_DIR):
+        self.path = path
+        self.leaflet_dir = os.path.abspath(leaflet_dir)
+        self.local = threading.local()
+        self.metadata = {}
+        self.version = 0
+        self.reload()
+
+    def reload(self):
+        self.local = threading.local()
+        self.metadata = {}
+        if not os.path.exists(self.path):
+            self.version = 0
+            return
+        self.version = int(os.path.getmtime(self.path))
+        conn = self._conn()
+        try:
+            self.metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+        except sqlite3.Error:
+            self.metadata = {}
+
+    @property
+    def available(self):
+        return self.version != 0
+
+    @property
+    def leaflet_available(self):
+        return os.path.exists(os.path.join(self.leaflet_dir, "leaflet.js"))
+
+    @property
+    def format(self):
+        return self.metadata.get('format', 'png')
+
+    @property
+    def max_zoom(self):
+        return int(self.metadata.get('maxzoom', 18))
+
+    def _conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self.local.conn = conn
+        return conn
+
+    def get(self, z, x, y):
+        if not self.available:
+            return None
+        tms_y = (1 << z) - 1 - y
+        row = self._conn().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, tms_y)
+        ).fetchone()
+        return row[0] if row else None
+
+    def register(self, server, leaflet_dir=None):
+        if leaflet_dir is not None:
+            self.leaflet_dir = os.path.abspath(leaflet_dir)
+
+        @server.route("/tiles/<int:z>/<int:x>/<int:y>.<ext>")
+        def offline_tile(z, x, y, ext):
+            data = self.get(z, x, y)
+            if data is None:
+                resp = Response(status=404)
+                resp.cache_control.max_age = MISSING_TILE_MAX_AGE
+                return resp
+            resp = Response(data, mimetype=TILE_MIMETYPES.get(self.format, 'application/octet-stream'))
+            resp.set_etag(f"{self.version}-{z}-{x}-{y}")
+            resp.cache_control.public = True
+            resp.cache_control.max_age = TILE_MAX_AGE
+            return resp.make_conditional(request)
+
+        @server.route("/leaflet/<path:filename>")
+        def offline_leaflet(filename):
+            return send_from_directory(self.leaflet_dir, filename, max_age=TILE_MAX_AGE)
+
+
+tile_cache = TileCache()
+
+LEAFLET_MISSING = "Offline map unavailable: Leaflet is missing from {dir}. Run: python offline_map.py leaflet"
+TILES_MISSING = "Offline tiles missing ({path}). Seed them before the flight with offline_map.py"
+
+
+def message_html(message):
+    """Placeholder page for the map iframe"""
+    return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body {{
+                    margin: 0;
+                    padding: 0;
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                    height: 100vh;
+                    background-color: #2c2c2c;
+                    color: #666;
+                    font-family: Arial, sans-serif;
+                    text-align: center;
+                }}
+            </style>
+        </head>
+        <body>
+            <div>{message}</div>
+        </body>
+        </html>
+        """
+
+
+def map_html(lat, lon, alt, path=None, landing=None, ellipse=None):
+    """Leaflet map page for the map iframe, using only locally served tiles and scripts"""
+    if not tile_cache.leaflet_available:
+        return message_html(LEAFLET_MISSING.format(dir=tile_cache.leaflet_dir))
+    notice = ""
+    if not tile_cache.available:
+        notice = f'<div id="notice">{TILES_MISSING.format(path=os.path.abspath(tile_cache.path))}</div>'
+    layers = []
+    if path:
+        coords = ",".join(f"[{p['lat']}, {p['lon']}]" for p in path)
+        layers.append(f'L.polyline([{coords}], {{color: "#00FF00", opacity: 0.8, weight: 3}}).addTo(map);')
+    if landing:
+        layers.append(
+            f'L.marker([{landing["lat"]}, {landing["lon"]}], {{title: "Predicted Landing"}}).addTo(map)'
+            f'.bindPopup("<b>Predicted Landing</b><br>in {landing["time_to_land"] / 60:.1f} min");'
+        )
+    if ellipse:
+        coords = ",".join(f"[{plat}, {plon}]" for plat, plon in ellipse)
+        layers.append(
+            f'L.polygon([{coords}], {{color: "#FFAA00", weight: 2, fillOpacity: 0.15}}).addTo(map);'
+        )
+    layers_js = "\n                ".join(layers)
+    return f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <link rel="stylesheet" href="/leaflet/leaflet.css">
+            <script src="/leaflet/leaflet.js"></script>
+            <style>
+                body {{ margin: 0; padding: 0; background-color: #2c2c2c; }}
+                #map {{ height: 100vh; width: 100%; }}
+                #notice {{
+                    position: absolute; top: 0; left: 0; right: 0; z-index: 1000; padding: 4px;
+                    background-color: rgba(0, 0, 0, 0.7); color: #FFAA00; font: 12px Arial, sans-serif;
+                    text-align: center;
+                }}
+            </style>
+        </head>
+        <body>
+            {notice}
+            <div id="map"></div>
+            <script>
+                if (typeof L === "undefined") {{
+                    document.body.innerHTML = '<div style="color: #666; font-family: Arial, sans-serif; '
+                        + 'padding: 20px; text-align: center">Offline map unavailable: /leaflet/leaflet.js did not load</div>';
+                    throw new Error("Leaflet missing");
+                }}
+                const map = L.map("map", {{ zoomAnimation: false }}).setView([{lat}, {lon}], 15);
+                L.tileLayer("/tiles/{{z}}/{{x}}/{{y}}.{tile_cache.format}", {{
+                    maxNativeZoom: {tile_cache.max_zoom},
+                    maxZoom: 19
+                }}).addTo(map);
+                L.circleMarker([{lat}, {lon}], {{
+                    radius: 8, color: "#FFFFFF", weight: 2, fillColor: "#FF0000", fillOpacity: 0.8
+                }}).addTo(map).bindPopup("<b>Current Position</b><br>Lat: {lat}<br>Lon: {lon}<br>Alt: {alt}m");
+                {layers_js}
+            </script>
+        </body>
+        </html>
+        """
+
+
+def _tile_range(lat_min, lon_min, lat_max, lon_max, z):
+    def tile(lat, lon):
+        n = 1 << z
+        x = int((lon + 180.0) / 360.0 * n)
+        y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+    x0, y0 = tile(lat_max, lon_min)
+    x1, y1 = tile(lat_min, lon_max)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+def fetch_leaflet(directory=LEAFLET_DIR, version=LEAFLET_VERSION):
+    """Download the Leaflet files the offline map serves; run once with network access"""
+    for name in LEAFLET_FILES:
+        target = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        url = LEAFLET_URL.format(version=version, name=name)
+        req = urllib.request.Request(url, headers={"User-Agent": "balloon-ground-station"})
+        with urllib.request.urlopen(req, timeout=30) as r:
+            data = r.read()
+        with open(target, "wb") as f:
+            f.write(data)
+    print(f"✓ Leaflet {version} installed in {os.path.abspath(directory)}")
+
+
+def seed(path, url_template, bbox, min_zoom, max_zoom, fmt="png", delay=0.05):
+    """Download tiles for bbox (lat_min, lon_min, lat_max, lon_max) into an MBTiles file before the flight"""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, "
+                 "tile_row INTEGER, tile_data BLOB, PRIMARY KEY (zoom_level, tile_column, tile_row))")
+    conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)", [
+        ('name', 'balloon'), ('format', fmt), ('minzoom', str(min_zoom)), ('maxzoom', str(max_zoom)),
+        ('bounds', f"{bbox[1]},{bbox[0]},{bbox[3]},{bbox[2]}"),
+    ])
+    count = 0
+    for z in range(min_zoom, max_zoom + 1):
+        for x, y in _tile_range(*bbox, z):
+            tms_y = (1 << z) - 1 - y
+            if conn.execute("SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                            (z, x, tms_y)).fetchone():
+                continue
+            url = url_template.format(z=z, x=x, y=y)
+            req = urllib.request.Request(url, headers={"User-Agent": "balloon-ground-station"})
+            try:
+                with urllib.request.urlopen(req, timeout=10) as r:
+                    data = r.read()
+            except Exception as e:
+                print(f"✗ {url}: {e}")
+                continue
+            conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, tms_y, data))
+            count += 1
+            if count % 100 == 0:
+                conn.commit()
+                print(f"{count} tiles")
+            time.sleep(delay)
+    conn.commit()
+    conn.close()
+    print(f"✓ Seeded {count} tiles into {path}")
+
+
+if __name__ == "__main__":
+    # python offline_map.py leaflet [dir]
+    # python offline_map.py <url_template> <lat_min> <lon_min> <lat_max> <lon_max> <min_zoom> <max_zoom> [out.mbtiles]
+    if len(sys.argv) >= 2 and sys.argv[1] == "leaflet":
+        fetch_leaflet(sys.argv[2] if len(sys.argv) > 2 else LEAFLET_DIR)
+        sys.exit(0)
+    if len(sys.argv) < 8:
+        print("usage: offline_map.py leaflet [dir]")
+        print("       offline_map.py url_template lat_min lon_min lat_max lon_max min_zoom max_zoom [out]")
+        sys.exit(1)
+    url_template = sys.argv[1]
+    bbox = tuple(float(v) for v in sys.argv[2:6])
+    out = sys.argv[8] if len(sys.argv) > 8 else MBTILES_PATH
+    fmt = url_template.rsplit('.', 1)[-1].split('?')[0]
+    seed(out, url_template, bbox, int(sys.argv[6]), int(sys.argv[7]),
+         fmt if fmt in TILE_MIMETYPES else "png")
@@ -0,0 +1,110 @@
+"""Run autocap.py on stub camera + pty serial and time image requests end to end.
+
+usage: python payload_loadtest.py [requests]
+
+Plays the radio, flight computer and ground station at the far end of the
+payload's pty: answers GG with a fake fix, sends PACKET_PLEASE and parses
+the downlink with the ground station's packet parser until the frame's FC.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fec import PARITY_HEADER
+from protocol import read_packet, parse_packet
+from serial_backends import connect_pty
+
+FAKE_FIX = b"13.736717,100.523186,1200.0\n"
+STARTUP_TIMEOUT = 30
+FRAME_TIMEOUT = 60
+
+
+def receive_frame(ser):
+    """Parse the downlink until FC.
+
+    Returns (image chunks, image bytes, parity chunks, seconds to first image
+    chunk or None if the frame had none). An IX packet only counts once its
+    trailer says what it was: PL image chunk, PR parity or PT thumbnail.
+    """
+    start = time.perf_counter()
+    first_chunk = None
+    pack_size = 0
+    pending = None  # (payload, arrival) of the IX packet waiting for its trailer
+    chunks = 0
+    received = 0
+    parity = 0
+    while time.perf_counter() - start < FRAME_TIMEOUT:
+        line = read_packet(ser, pack_size)
+        if not line:
+            continue
+        while pack_size == 0 and line.startswith(b"GG") and line[2:3] != b":":
+            # GPS query from the payload, not a downlink packet
+            ser.write(FAKE_FIX)
+            line = line[2:]
+        if not line:
+            continue
+        header, data = parse_packet(line, binary=pack_size > 0)
+        if pack_size > 0:
+            pack_size = 0
+            pending = (data, time.perf_counter() - start)
+            continue
+        packet, pending = pending, None
+        if header == "PS":
+            pack_size = int(data)
+        elif header == "PL" and packet is not None:
+            chunks += 1
+            received += len(packet[0])
+            if first_chunk is None:
+                first_chunk = packet[1]
+        elif header == PARITY_HEADER and packet is not None:
+            parity += 1
+        elif header == "FC":
+            return chunks, received, parity, first_chunk
+    raise TimeoutError("no FC received")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    here = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix="balloon_loadtest_")
+    link = os.path.join(workdir, "payload_tty")
+    env = dict(os.environ,
+               BALLOON_CAMERA="stub",
+               BALLOON_SERIAL="pty",
+               BALLOON_SERIAL_PORT=link,
+               BALLOON_PICTURES=os.path.join(workdir, "pictures"))
+    proc = subprocess.Popen([sys.executable, os.path.join(here, "autocap.py")], env=env, cwd=workdir)
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not os.path.exists(link):
+            if time.monotonic() > deadline or proc.poll() is not None:
+                raise RuntimeError("payload did not start")
+            time.sleep(0.1)
+        ser = connect_pty(link, timeout=0.2)
+        time.sleep(3)  # first capture + pre-encode
+        latencies = []
+        for i in range(requests):
+            start = time.perf_counter()
+            ser.write(b"PACKET_PLEASE\n")
+            chunks, received, parity, first_chunk = receive_frame(ser)
+            total = time.perf_counter() - start
+            if first_chunk is None:
+                print(f"request {i + 1}: empty frame (FC without image chunks) after {total * 1000:.1f} ms")
+                continue
+            latencies.append(total)
+            print(f"request {i + 1}: {chunks} chunks, {received} bytes (+{parity} parity), "
+                  f"first chunk {first_chunk * 1000:.1f} ms, complete {total * 1000:.1f} ms")
+        if not latencies:
+            print("no frame received")
+            return
+        latencies.sort()
+        print(f"median {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import functools
+import time
+
+import metrics
+from config import config
+
+STAGE_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class StageProfiler:
+    """Opt-in scoped timers for the ingest and dashboard stages.
+
+    Timings go into one histogram labelled by stage (also exported on
+    /metrics). While disabled, start() returns None and lap()/stop() return
+    immediately, so the instrumented code pays an attribute check per stage.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histogram = metrics.Histogram("balloon_stage_seconds", "Profiled stage duration",
+                                           ["stage"], buckets=STAGE_BUCKETS)
+
+    def start(self):
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name, start, detail=None):
+        if start is None or not self.enabled:
+            return
+        self.histogram.observe(time.perf_counter() - start, stage=f"{name}.{detail}" if detail else name)
+
+    def lap(self, name, start):
+        """Record name since start and return the start of the next stage"""
+        if start is None or not self.enabled:
+            return self.start()
+        now = time.perf_counter()
+        self.histogram.observe(now - start, stage=name)
+        return now
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.histogram.observe(time.perf_counter() - start, stage=name)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.histogram.lock:
+            self.histogram.values.clear()
+
+    def dump(self):
+        """Current profile as a text table, slowest total first"""
+        with self.histogram.lock:
+            entries = [(key[0], list(counts), total, count)
+                       for key, (counts, total, count) in self.histogram.values.items()]
+        if not entries:
+            return "No profile data" + ("" if self.enabled else " (profiling is off)")
+        lines = [f"{'stage':<32}{'count':>9}{'total ms':>12}{'mean us':>11}{'p95 <= us':>11}"]
+        for stage, counts, total, count in sorted(entries, key=lambda e: -e[2]):
+            p95 = "inf"
+            cumulative = 0
+            for bound, n in zip(STAGE_BUCKETS, counts):
+                cumulative += n
+                if cumulative >= 0.95 * count:
+                    p95 = f"{bound * 1e6:.0f}"
+                    break
+            lines.append(f"{stage:<32}{count:>9}{total * 1e3:>12.1f}{total / count * 1e6:>11.1f}{p95:>11}")
+        return "\n".join(lines)
+
+
+profiler = StageProfiler(enabled=config.profiling)
@@ -0,0 +1,159 @@
+import base64
+import ctypes
+import ctypes.util
+import glob
+import os
+import threading
+import time
+
+PREVIEW_INTERVAL = 2.0  # s between preview refreshes while chunks are arriving
+PREVIEW_QUALITY = 50    # WebP quality of the re-encoded preview
+PENDING_GREY = 0x40     # fill for rows not received yet
+
+VP8_STATUS_OK = 0
+VP8_STATUS_SUSPENDED = 5    # incremental decoder waiting for more data
+MODE_RGB = 0
+
+_libwebp = None
+
+
+def _find_libwebp():
+    path = ctypes.util.find_library("webp")
+    if path is not None:
+        return path
+    # Pillow's Linux and macOS wheels ship their own libwebp next to the package
+    try:
+        import PIL
+    except ImportError:
+        return None
+    package = os.path.dirname(PIL.__file__)
+    for pattern in (os.path.join(os.path.dirname(package), "pillow.libs", "libwebp-*.so*"),
+                    os.path.join(package, ".dylibs", "libwebp.*dylib")):
+        matches = sorted(glob.glob(pattern))
+        if matches:
+            return matches[0]
+    return None
+
+
+def libwebp():
+    """libwebp through ctypes (incremental decoder + encoder), or None if it cannot be found"""
+    global _libwebp
+    if _libwebp is None:
+        path = _find_libwebp()
+        if path is None:
+            _libwebp = False
+            return None
+        lib = ctypes.CDLL(path)
+        lib.WebPINewRGB.restype = ctypes.c_void_p
+        lib.WebPINewRGB.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+        lib.WebPIAppend.restype = ctypes.c_int
+        lib.WebPIAppend.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t]
+        lib.WebPIDecGetRGB.restype = ctypes.c_void_p
+        lib.WebPIDecGetRGB.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        lib.WebPIDelete.restype = None
+        lib.WebPIDelete.argtypes = [ctypes.c_void_p]
+        lib.WebPEncodeRGB.restype = ctypes.c_size_t
+        lib.WebPEncodeRGB.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                      ctypes.c_float, ctypes.POINTER(ctypes.c_void_p)]
+        lib.WebPFree.restype = None
+        lib.WebPFree.argtypes = [ctypes.c_void_p]
+        _libwebp = lib
+    return _libwebp or None
+
+
+class ProgressivePreview:
+    """Partial image built from the PL chunks received so far.
+
+    Only the contiguous run of chunks from index 0 is usable (chunk 0 carries
+    the RIFF header). New bytes of that run are appended to a libwebp
+    incremental decoder, and the rows decoded so far are re-encoded as a
+    complete WebP with the rest filled grey, so the browser always gets a
+    valid image. Refreshes are throttled to one every PREVIEW_INTERVAL seconds.
+
+    Until rows are decoded (or without libwebp, e.g. on Windows) the preview
+    is the low-resolution thumbnail the payload sends ahead of the chunks.
+    """
+
+    def __init__(self, interval=PREVIEW_INTERVAL):
+        self.interval = interval
+        self.image = None
+        self.thumbnail = False  # image is the payload thumbnail, not decoded rows
+        self.chunks = 0     # contiguous chunks from index 0 fed to the decoder
+        self.size = 0
+        self.rows = 0
+        self.height = 0
+        self.decoder = None
+        self.failed = False
+        self.last_build = 0.0
+        self.lock = threading.Lock()
+
+    def offer_thumbnail(self, data):
+        """Show the payload's thumbnail (a complete small WebP) until rows are decoded"""
+        with self.lock:
+            if self.rows:
+                return False
+            self.image = base64.b64encode(data).decode()
+            self.thumbnail = True
+            return True
+
+    def offer(self, image_data):
+        """Called after each stored chunk. Returns True when the preview was refreshed."""
+        now = time.monotonic()
+        if now - self.last_build < self.interval:
+            return False
+        with self.lock:
+            self.last_build = now
+            if self.failed or 0 not in image_data:
+                return False
+            lib = libwebp()
+            if lib is None:
+                return False
+            if self.decoder is None:
+                self.decoder = lib.WebPINewRGB(MODE_RGB, None, 0, 0)
+            fed = self.chunks
+            while self.chunks in image_data:
+                chunk = image_data[self.chunks]
+                status = lib.WebPIAppend(self.decoder, chunk, len(chunk))
+                if status not in (VP8_STATUS_OK, VP8_STATUS_SUSPENDED):
+                    self.failed = True  # not a WebP stream; wait for the saved frame
+                    return False
+                self.chunks += 1
+                self.size += len(chunk)
+            if self.chunks == fed:
+                return False
+            return self._render(lib)
+
+    def _render(self, lib):
+        last_y, width, height, stride = (ctypes.c_int() for _ in range(4))
+        pixels = lib.WebPIDecGetRGB(self.decoder, ctypes.byref(last_y), ctypes.byref(width),
+                                    ctypes.byref(height), ctypes.byref(stride))
+        if not pixels or last_y.value <= self.rows:
+            return False
+        self.rows, self.height = last_y.value, height.value
+        rgb = (ctypes.string_at(pixels, stride.value * self.rows)
+               + bytes([PENDING_GREY]) * (stride.value * (self.height - self.rows)))
+        output = ctypes.c_void_p()
+        size = lib.WebPEncodeRGB(rgb, width.value, self.height, stride.value, PREVIEW_QUALITY,
+                                 ctypes.byref(output))
+        if not size:
+            return False
+        try:
+            self.image = base64.b64encode(ctypes.string_at(output, size)).decode()
+            self.thumbnail = False
+        finally:
+            lib.WebPFree(output)
+        return True
+
+    def clear(self):
+        with self.lock:
+            if self.decoder is not None:
+                libwebp().WebPIDelete(self.decoder)
+            self.decoder = None
+            self.failed = False
+            self.image = None
+            self.thumbnail = False
+            self.chunks = 0
+            self.size = 0
+            self.rows = 0
+            self.height = 0
+            self.last_build = 0.0
@@ -0,0 +1,42 @@
+SEQUENCE_HEADER = "SQ"
+
+
+def sequence_line(seq, sent_ms):
+    """Optional prefix before each downlink packet: sender sequence number and send time (ms, payload clock)"""
+    return f"{SEQUENCE_HEADER}:{seq},{sent_ms}\n".encode()
+
+
+def parse_sequence(data):
+    seq, sent_ms = data.split(",")
+    return int(seq), int(sent_ms)
+
+
+def sequence_request():
+    """Uplink asking the payload to prefix its packets with sequence_line()"""
+    return f"{SEQUENCE_HEADER}:1\n"
+
+
+def read_packet(ser, pack_size=0):
+    """Read the next packet: a text line, or a binary IX packet of pack_size bytes announced by PS"""
+    if pack_size > 0:
+        return ser.read(pack_size + 5)
+    return ser.readline()
+
+
+def parse_packet(line, binary=False):
+    """Split a raw packet into (header, data).
+
+    Binary packets keep their payload as bytes; text packets are decoded to
+    str, or returned as bytes under header "XX" when they are not ASCII.
+    """
+    try:
+        header = line[:2].decode("ascii")
+    except UnicodeDecodeError:
+        header = "XX"
+    if binary:
+        return header, line[2 + 1:-2]
+    body = line[2 + 1:-1]
+    try:
+        return header, body.decode("ascii")
+    except UnicodeDecodeError:
+        return "XX", body
@@ -0,0 +1,106 @@
+import threading
+
+
+class RenderCache:
+    """One rendered widget shared by every client asking for the same telemetry version.
+
+    The first caller after a version change renders under the lock; callers
+    arriving meanwhile wait for it and reuse the result, so the cost per tick
+    does not depend on the number of open browsers.
+    """
+
+    def __init__(self):
+        self.entry = (None, None)   # (version, rendered outputs)
+        self.lock = threading.Lock()
+
+    def get(self, version, render):
+        cached_version, value = self.entry
+        if cached_version == version:
+            return value
+        with self.lock:
+            cached_version, value = self.entry
+            if cached_version != version:
+                value = render()
+                self.entry = (version, value)
+            return value
+
+
+CALLBACK_PATH = "_dash-update-component"
+UNCACHED_HEADERS = ("content-length", "date", "set-cookie")
+
+
+class ResponseCache:
+    """Serialized Dash callback responses shared by every client, per telemetry version.
+
+    RenderCache saves the render, but Dash would still serialize (and
+    compress) the outputs once per request. Callbacks added here are
+    answered straight from the stored response bytes while their topics
+    keep the same versions, so another viewer costs a dict lookup. Each
+    content encoding the server produced is kept, and a client gets one it
+    accepts.
+    """
+
+    def __init__(self, versions):
+        self.versions = versions    # topics -> hashable version key
+        self.callbacks = {}         # frozenset of "id.property" outputs -> topics
+        self.entries = {}           # outputs -> (version key, {content encoding: (body, headers)})
+        self.lock = threading.Lock()
+
+    def add(self, outputs, topics):
+        self.callbacks[frozenset(outputs)] = tuple(topics)
+
+    @staticmethod
+    def _outputs(body):
+        outputs = body.get("outputs")
+        if isinstance(outputs, dict):
+            outputs = [outputs]
+        if not isinstance(outputs, list):
+            return None
+        return frozenset(f"{o.get('id')}.{o.get('property')}" for o in outputs if isinstance(o, dict))
+
+    def lookup(self, outputs, version, accept_encoding):
+        """(body, headers) cached for outputs at version in an encoding the client accepts, or None"""
+        cached_version, variants = self.entries.get(outputs, (None, {}))
+        if cached_version != version:
+            return None
+        for encoding, response in variants.items():
+            if encoding is not None and encoding in accept_encoding:
+                return response
+        return variants.get(None)
+
+    def store(self, outputs, version, encoding, body, headers):
+        with self.lock:
+            cached_version, variants = self.entries.get(outputs, (None, {}))
+            if cached_version != version:
+                variants = {}
+            self.entries[outputs] = (version, {**variants, encoding: (body, headers)})
+
+    def register(self, server):
+        """Hook the callback route; register before any compression so responses are stored compressed"""
+        from flask import Response, g, request
+
+        @server.before_request
+        def cached_callback_response():
+            if request.method != "POST" or not request.path.endswith(CALLBACK_PATH):
+                return None
+            outputs = self._outputs(request.get_json(silent=True) or {})
+            topics = self.callbacks.get(outputs)
+            if topics is None:
+                return None
+            version = self.versions(topics)
+            cached = self.lookup(outputs, version, request.headers.get("Accept-Encoding", ""))
+            if cached is None:
+                g.response_cache_key = (outputs, version)
+                return None
+            body, headers = cached
+            return Response(body, headers=headers)
+
+        @server.after_request
+        def store_callback_response(response):
+            key = g.pop("response_cache_key", None)
+            if key is None or response.status_code != 200 or response.direct_passthrough:
+                return response
+            headers = [(name, value) for name, value in response.headers.items()
+                       if name.lower() not in UNCACHED_HEADERS]
+            self.store(*key, response.headers.get("Content-Encoding"), response.get_data(), headers)
+            return response
@@ -0,0 +1,108 @@
+import os
+import select
+import termios
+import time
+import tty
+
+
+class PtySerial:
+    """Minimal pyserial-compatible port on a pseudo-terminal file descriptor"""
+
+    def __init__(self, fd, name, timeout=1):
+        tty.setraw(fd)
+        self.fd = fd
+        self.name = name
+        self.timeout = timeout
+        self.buffer = bytearray()
+        self.is_open = True
+
+    def _fill(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return False
+        try:
+            chunk = os.read(self.fd, 4096)
+        except OSError:
+            # the other end is not open (yet); behave like an idle line
+            time.sleep(max(timeout, 0))
+            return False
+        self.buffer += chunk
+        return bool(chunk)
+
+    @property
+    def in_waiting(self):
+        self._fill(0)
+        return len(self.buffer)
+
+    def _take(self, size):
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read(self, size=1):
+        deadline = time.monotonic() + self.timeout
+        while len(self.buffer) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._fill(remaining)
+        return self._take(size)
+
+    def readline(self):
+        deadline = time.monotonic() + self.timeout
+        while b"\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._take(len(self.buffer))
+            self._fill(remaining)
+        return self._take(self.buffer.index(b"\n") + 1)
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+        return len(data)
+
+    def reset_input_buffer(self):
+        self.buffer.clear()
+        termios.tcflush(self.fd, termios.TCIFLUSH)
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            os.close(self.fd)
+
+
+def open_pty(link=None, timeout=1):
+    """Create a pty pair. Returns (PtySerial on the master, path of the slave).
+
+    The slave stays open in this process so the master does not hang up
+    before the other side connects; if link is given it is symlinked to the
+    slave so the other side can find it.
+    """
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+    if link:
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(name, link)
+    ser = PtySerial(master, name, timeout=timeout)
+    ser.slave_fd = slave
+    return ser, name
+
+
+def connect_pty(path, timeout=1):
+    """Open the far end of a pty created with open_pty"""
+    return PtySerial(os.open(path, os.O_RDWR | os.O_NOCTTY), path, timeout=timeout)
+
+
+def open_serial(backend, port, baudrate=115200, timeout=1):
+    """'pyserial' opens a real port; 'pty' creates a loopback pty linked at port"""
+    if backend == "pty":
+        ser, name = open_pty(link=port, timeout=timeout)
+        print(f"Serial loopback on {name} (linked at {port})")
+        return ser
+    import serial
+    return serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
@@ -0,0 +1,41 @@
+from config import config
+
+# "dev": Flask dev server with Dash debug tools (the old behaviour)
+# "prod": waitress, debug off, gzip-compressed callback responses
+SERVE_MODE = config.serve
+HOST = config.host
+PORT = config.listen_port
+# Each open /events stream holds one thread; at most EVENT_STREAMS do, and
+# MIN_FREE_THREADS always stay free for page loads and callbacks
+WSGI_THREADS = config.wsgi_threads
+EVENT_STREAMS = config.event_streams
+MIN_FREE_THREADS = 4
+
+
+def serve(app, host=HOST, port=PORT, mode=None):
+    """Run the Dash app. Ingest threads live in this process, so prod mode stays single-process."""
+    mode = mode or SERVE_MODE
+    if mode != "prod":
+        app.run(debug=True, host=host, port=port, use_reloader=False)
+        return
+
+    # Production bundles, no dev tools UI, no hot reload, no layout validation per callback
+    app.enable_dev_tools(debug=False, dev_tools_ui=False, dev_tools_props_check=False,
+                         dev_tools_serve_dev_bundles=False, dev_tools_hot_reload=False)
+    app.config.suppress_callback_exceptions = True
+
+    try:
+        from flask_compress import Compress
+        Compress(app.server)
+    except ImportError:
+        print("flask-compress not installed, responses are sent uncompressed")
+
+    from live_events import live_events
+    streams = max(0, min(EVENT_STREAMS, WSGI_THREADS - MIN_FREE_THREADS))
+    if streams < EVENT_STREAMS:
+        print(f"Only {streams} live event streams fit in {WSGI_THREADS} threads, further dashboards poll")
+    live_events.max_streams = streams
+
+    from waitress import serve as waitress_serve
+    print(f"Serving on http://{host}:{port} (waitress, {WSGI_THREADS} threads, {streams} live streams)")
+    waitress_serve(app.server, host=host, port=port, threads=WSGI_THREADS)
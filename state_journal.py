@@ -0,0 +1,235 @@
+import base64
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from config import config
+from landing import LandingPredictor
+
+JOURNAL_NAME = "journal.jsonl"
+CHECKPOINT_INTERVAL = 1.0       # s between journal flushes (write + fsync)
+COMPACT_BYTES = 1024 * 1024     # journal is rewritten as one snapshot past this size
+RESUME_WINDOW = 15 * 60         # s, a session journal touched this recently is resumed on restart
+
+GPS_KEEP = config.gps_history
+RSSI_KEEP = 2 * config.rssi_history     # both ports together
+LOG_KEEP = config.log_history
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def recent_session(root, window=RESUME_WINDOW):
+    """Name of the newest session under root whose journal was written within window seconds, or None"""
+    if not os.path.isdir(root):
+        return None
+    newest = None
+    for session in os.listdir(root):
+        try:
+            mtime = os.path.getmtime(os.path.join(root, session, JOURNAL_NAME))
+        except OSError:
+            continue
+        if newest is None or mtime > newest[0]:
+            newest = (mtime, session)
+    if newest is None or time.time() - newest[0] > window:
+        return None
+    return newest[1]
+
+
+class SessionState:
+    """Ground station telemetry state as rebuilt from the journal"""
+
+    def __init__(self):
+        self.gps = deque(maxlen=GPS_KEEP)       # (lat, lon, alt, t)
+        self.rssi = deque(maxlen=RSSI_KEEP)     # (port, value, t)
+        self.log = deque(maxlen=LOG_KEEP)
+        self.chunks = {}                        # index -> bytes
+        self.parity = {}                        # (group, index) -> bytes
+        self.fec = None
+        self.ports = set()
+        self.frame_count = 0
+        self.apogee = False
+        self.landing = LandingPredictor(ground_alt=config.ground_alt)  # fed with wall-clock times
+
+    def apply(self, record):
+        kind = record['k']
+        if kind == "gps":
+            self.gps.append((record['lat'], record['lon'], record['alt'], record['t']))
+            try:
+                self.landing.update(float(record['lat']), float(record['lon']), float(record['alt']), record['t'])
+            except (TypeError, ValueError):
+                pass
+        elif kind == "rssi":
+            self.rssi.append((record['port'], record['v'], record['t']))
+        elif kind == "log":
+            self.log.append(record['line'])
+        elif kind == "chunk":
+            self.chunks[record['i']] = base64.b64decode(record['d'])
+            self.ports.add(record['port'])
+        elif kind == "parity":
+            self.parity[(record['g'], record['j'])] = base64.b64decode(record['d'])
+            self.fec = tuple(record['fec'])
+        elif kind == "fc":
+            self.frame_count = record['n']
+        elif kind == "saved":
+            self.chunks = {}
+            self.parity = {}
+            self.fec = None
+            self.ports = set()
+        elif kind == "apogee":
+            self.apogee = True
+            self.landing.mark_apogee()
+        elif kind == "snapshot":
+            self._load(record)
+
+    def snapshot(self):
+        return {
+            'k': "snapshot",
+            'gps': list(self.gps),
+            'rssi': list(self.rssi),
+            'log': list(self.log),
+            'chunks': [[i, _b64(d)] for i, d in self.chunks.items()],
+            'parity': [[g, j, _b64(d)] for (g, j), d in self.parity.items()],
+            'fec': self.fec,
+            'ports': sorted(self.ports),
+            'frame_count': self.frame_count,
+            'apogee': self.apogee,
+            'landing': self.landing.to_dict(),
+        }
+
+    def _load(self, record):
+        self.gps = deque((tuple(g) for g in record['gps']), maxlen=GPS_KEEP)
+        self.rssi = deque((tuple(r) for r in record['rssi']), maxlen=RSSI_KEEP)
+        self.log = deque(record['log'], maxlen=LOG_KEEP)
+        self.chunks = {i: base64.b64decode(d) for i, d in record['chunks']}
+        self.parity = {(g, j): base64.b64decode(d) for g, j, d in record['parity']}
+        self.fec = tuple(record['fec']) if record['fec'] else None
+        self.ports = set(record['ports'])
+        self.frame_count = record['frame_count']
+        self.apogee = record['apogee']
+        self.landing = LandingPredictor.from_dict(record['landing'])
+        self.landing.ground_alt = config.ground_alt
+
+
+class NullJournal:
+    """Stand-in used until a session is started: records nothing"""
+
+    resumed = False
+
+    def record(self, kind, **fields):
+        pass
+
+    def gps(self, lat, lon, alt, t=None):
+        pass
+
+    def rssi(self, port, value, t=None):
+        pass
+
+    def log(self, line):
+        pass
+
+    def chunk(self, index, data, port):
+        pass
+
+    def parity(self, group, index, fec, data):
+        pass
+
+    def close(self):
+        pass
+
+
+class StateJournal:
+    """Append-only, crash-safe journal of ground station telemetry state.
+
+    record() is called from the ingest threads and only queues a JSON line;
+    a background thread appends and fsyncs the queue every
+    CHECKPOINT_INTERVAL. Past COMPACT_BYTES the file is atomically replaced
+    by a single snapshot, so startup replays at most one snapshot plus a
+    short tail. A torn last line from a crash is ignored.
+    """
+
+    def __init__(self, directory, name=JOURNAL_NAME, interval=CHECKPOINT_INTERVAL):
+        self.path = os.path.join(directory, name)
+        self.interval = interval
+        self.state = SessionState()
+        self.pending = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.resumed = os.path.exists(self.path) and self._replay()
+        # start every run from a compact file
+        self._compact(json.dumps(self.state.snapshot()))
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def _replay(self):
+        count = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.state.apply(record)
+                count += 1
+        return count > 0
+
+    def record(self, kind, **fields):
+        fields['k'] = kind
+        with self.lock:
+            self.state.apply(fields)
+            self.pending.append(json.dumps(fields))
+
+    def gps(self, lat, lon, alt, t=None):
+        self.record("gps", lat=lat, lon=lon, alt=alt, t=time.time() if t is None else t)
+
+    def rssi(self, port, value, t=None):
+        self.record("rssi", port=port, v=value, t=time.time() if t is None else t)
+
+    def log(self, line):
+        self.record("log", line=line)
+
+    def chunk(self, index, data, port):
+        self.record("chunk", i=index, d=_b64(data), port=port)
+
+    def parity(self, group, index, fec, data):
+        self.record("parity", g=group, j=index, fec=list(fec), d=_b64(data))
+
+    def _compact(self, snapshot):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(snapshot + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def checkpoint(self):
+        with self.lock:
+            lines, self.pending = self.pending, []
+            snapshot = None
+            if self.file.tell() > COMPACT_BYTES:
+                snapshot = json.dumps(self.state.snapshot())
+        if snapshot is not None:
+            self.file.close()
+            self._compact(snapshot)
+            self.file = open(self.path, "a", encoding="utf-8")
+        elif lines:
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def _writer(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print(f"Journal checkpoint failed: {e}")
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.checkpoint()
+        self.file.close()
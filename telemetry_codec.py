@@ -0,0 +1,105 @@
+import base64
+import struct
+
+# "TZ:<base85 records>\n" carries one burst of packed telemetry records.
+# The ground station sends "TC:2\n" on connect to announce it can decode them;
+# until then (or for any other version) the payload keeps sending plain text lines.
+COMPACT_HEADER = "TZ"
+CAPABILITY_HEADER = "TC"
+CAPABILITY_VERSION = "2"
+
+# Record kinds 1 and 2 were GPS records without a fix counter (TC:1); 3 and 4
+# (frame counter, RSSI) were never sent: FC stays a text line in order with
+# the chunks, and RSSI is measured by the ground radios
+REC_GPS_FULL = 5        # <Biii  fix counter, lat, lon in 1e-7 deg, alt in dm
+REC_GPS_DELTA = 6       # <Bhhh  fix counter, lat, lon in 1e-5 deg, alt in dm, relative to fix counter - 1
+
+GPS_SCALE = 10 ** 7
+DELTA_STEP = 100        # GPS_SCALE units per delta unit (1e-5 deg, ~1 m)
+ALT_SCALE = 10
+KEYFRAME_INTERVAL = 10  # full fix at least every N fixes so a lost keyframe heals
+INT16 = (-32768, 32767)
+
+
+def capability_line():
+    return f"{CAPABILITY_HEADER}:{CAPABILITY_VERSION}\n"
+
+
+class TelemetryEncoder:
+    """Payload side: packs telemetry into fixed-point records, GPS delta-encoded"""
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.last = None
+        self.since_key = 0
+        self.counter = 0
+        self.records = []
+
+    def gps(self, lat, lon, alt):
+        fix = (round(float(lat) * GPS_SCALE), round(float(lon) * GPS_SCALE), round(float(alt) * ALT_SCALE))
+        self.counter = (self.counter + 1) & 0xFF
+        if self.last is not None and self.since_key < self.keyframe_interval:
+            delta = (round((fix[0] - self.last[0]) / DELTA_STEP),
+                     round((fix[1] - self.last[1]) / DELTA_STEP),
+                     fix[2] - self.last[2])
+            if all(INT16[0] <= d <= INT16[1] for d in delta):
+                self.records.append(struct.pack('<BBhhh', REC_GPS_DELTA, self.counter, *delta))
+                # track the value the decoder will reconstruct so rounding never accumulates
+                self.last = (self.last[0] + delta[0] * DELTA_STEP,
+                             self.last[1] + delta[1] * DELTA_STEP,
+                             self.last[2] + delta[2])
+                self.since_key += 1
+                return
+        self.records.append(struct.pack('<BBiii', REC_GPS_FULL, self.counter, *fix))
+        self.last = fix
+        self.since_key = 0
+
+    def flush(self):
+        """Returns the TZ line for the pending records, or None"""
+        if not self.records:
+            return None
+        payload = b"".join(self.records)
+        self.records = []
+        return f"{COMPACT_HEADER}:".encode() + base64.b85encode(payload) + b"\n"
+
+
+class TelemetryDecoder:
+    """Ground side: turns a TZ payload back into (header, text) pairs like GS lines.
+
+    A delta is only applied on top of the fix right before it (by fix
+    counter). After a lost TZ line deltas are dropped until the next full fix,
+    so a decoded position is either exact or not reported at all.
+    """
+
+    def __init__(self):
+        self.last = None
+        self.counter = None
+
+    def decode(self, text):
+        payload = base64.b85decode(text)
+        items = []
+        offset = 0
+        while offset < len(payload):
+            kind = payload[offset]
+            offset += 1
+            if kind == REC_GPS_FULL:
+                self.counter, *fix = struct.unpack_from('<Biii', payload, offset)
+                self.last = tuple(fix)
+                offset += 13
+                items.append(("GS", self._gps_text()))
+            elif kind == REC_GPS_DELTA:
+                counter, dlat, dlon, dalt = struct.unpack_from('<Bhhh', payload, offset)
+                offset += 7
+                if self.last is None or counter != (self.counter + 1) & 0xFF:
+                    self.last = None  # base fix lost; wait for the next full fix
+                    continue
+                self.counter = counter
+                self.last = (self.last[0] + dlat * DELTA_STEP, self.last[1] + dlon * DELTA_STEP, self.last[2] + dalt)
+                items.append(("GS", self._gps_text()))
+            else:
+                raise ValueError(f"unknown telemetry record {kind}")
+        return items
+
+    def _gps_text(self):
+        lat, lon, alt = self.last
+        return f"{lat / GPS_SCALE:.7f},{lon / GPS_SCALE:.7f},{alt / ALT_SCALE:.1f}"
@@ -0,0 +1,73 @@
+import pytest
+
+import config
+
+
+def test_defaults_without_file_or_environment(tmp_path):
+    resolved = config.load([], environ={"BALLOON_CONFIG": str(tmp_path / "missing.ini")})
+    assert resolved.port1 == "COM11"
+    assert resolved.sources['port1'] == "default"
+    assert resolved.preset == "default"
+
+
+def test_later_sources_win(tmp_path):
+    ini = tmp_path / "balloon.ini"
+    ini.write_text("[balloon]\npreset = low-power\nbaudrate = 9600\nport1 = COM1\nport2 = COM2\n")
+    environ = {"BALLOON_CONFIG": str(ini), "BALLOON_PORT2": "COM22"}
+    resolved = config.load(["--port2", "COM33"], environ=environ)
+    assert resolved.preset == "low-power"
+    assert resolved.wsgi_threads == config.PRESETS['low-power']['wsgi_threads']
+    assert resolved.baudrate == 9600
+    assert resolved.port1 == "COM1"
+    assert resolved.port2 == "COM33"
+    assert resolved.sources['port2'] == "command line"
+    environ_only = config.load([], environ=environ)
+    assert environ_only.port2 == "COM22"
+    assert environ_only.sources['port2'] == "environment"
+
+
+def test_preset_section_in_file(tmp_path):
+    ini = tmp_path / "balloon.ini"
+    ini.write_text("[preset:field]\nrefresh_ms = 500\n")
+    resolved = config.load(["--preset", "field"], environ={"BALLOON_CONFIG": str(ini)})
+    assert resolved.refresh_ms == 500
+
+
+def test_typed_values_and_errors(tmp_path):
+    environ = {"BALLOON_CONFIG": str(tmp_path / "missing.ini"), "BALLOON_FEC": "off",
+               "BALLOON_CAMERAS": "0,1", "BALLOON_CAPTURE_SIZE": "640x480", "BALLOON_RESUME": "0"}
+    resolved = config.load([], environ=environ)
+    assert resolved.fec is None
+    assert resolved.cameras == (0, 1)
+    assert resolved.capture_size == (640, 480)
+    assert resolved.resume is False
+    with pytest.raises(ValueError, match="baudrate"):
+        config.load(["--baudrate", "fast"], environ=environ)
+    with pytest.raises(ValueError, match="Unknown preset"):
+        config.load(["--preset", "nope"], environ=environ)
+
+
+def test_unknown_and_prefix_flags_are_ignored(tmp_path):
+    environ = {"BALLOON_CONFIG": str(tmp_path / "missing.ini")}
+    # another program's flags, including prefixes of ours, must not be taken as settings
+    resolved = config.load(["--port", "x", "--baud", "9600", "-q"], environ=environ)
+    assert resolved.port1 == "COM11"
+    assert resolved.baudrate == 115200
+
+
+def test_import_does_not_read_the_command_line(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["prog", "--port1", "COM99"])
+    assert config.load().port1 != "COM99"
+
+
+def test_configure_updates_the_shared_config(monkeypatch, tmp_path):
+    monkeypatch.setenv("BALLOON_CONFIG", str(tmp_path / "missing.ini"))
+    saved = dict(config.config.__dict__)
+    try:
+        shared = config.config
+        assert config.configure(["--port1", "COM42"]) is shared
+        assert shared.port1 == "COM42"
+        assert shared.sources['port1'] == "command line"
+    finally:
+        config.config.__dict__.clear()
+        config.config.__dict__.update(saved)
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from ground import station
+from link_timing import SequenceFilter
+from protocol import SEQUENCE_HEADER, parse_packet, parse_sequence, sequence_line
+from telemetry_codec import COMPACT_HEADER, TelemetryDecoder, TelemetryEncoder
+
+FIXES = 20
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """GS texts handled by the station, with fresh dedup and decoder state"""
+    fixes = []
+    monkeypatch.setattr(station, "sequence_filter", SequenceFilter())
+    monkeypatch.setitem(station.telemetry_decoders, 1, TelemetryDecoder())
+    monkeypatch.setitem(station.telemetry_decoders, 2, TelemetryDecoder())
+    monkeypatch.setitem(station.TELEMETRY_HANDLERS, "GS", lambda data, port_num, arrival: fixes.append(data))
+    return fixes
+
+
+def downlink():
+    """(SQ line, TZ line) per fix, as the payload sends them with sequence numbers on"""
+    encoder = TelemetryEncoder()
+    packets = []
+    for i in range(FIXES):
+        encoder.gps(48.1 + i * 1e-4, 11.5 - i * 2e-4, 300 + 5 * i)
+        packets.append((sequence_line(i + 1, 1000 * i), encoder.flush()))
+    return packets
+
+
+def expected(packets):
+    decoder = TelemetryDecoder()
+    return [text for _, line in packets for _, text in decoder.decode(parse_packet(line)[1])]
+
+
+class Port:
+    """The SQ/TZ part of serial_worker for one port"""
+
+    def __init__(self, port_num):
+        self.port_num = port_num
+        self.seq = None
+
+    def receive(self, line):
+        header, data = parse_packet(line)
+        if header == SEQUENCE_HEADER:
+            self.seq = parse_sequence(data)
+        elif header == COMPACT_HEADER:
+            seq, self.seq = self.seq, None
+            station.handle_compact(data, self.port_num, seq=seq)
+
+
+def interleave(packets, lost=None, seed=3):
+    """Both ports receive every packet (except lost[port]), the winner of each race chosen at random"""
+    lost = lost or {}
+    ports = {1: Port(1), 2: Port(2)}
+    rng = random.Random(seed)
+    for i, packet in enumerate(packets):
+        order = [1, 2] if rng.random() < 0.5 else [2, 1]
+        for port_num in order:
+            if i not in lost.get(port_num, ()):
+                for line in packet:
+                    ports[port_num].receive(line)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_every_fix_is_handled_once_whichever_port_wins(handled, seed):
+    packets = downlink()
+    interleave(packets, seed=seed)
+    assert handled == expected(packets)
+
+
+def test_fix_lost_on_one_port_is_handled_from_the_other(handled):
+    packets = downlink()
+    # port 2 misses a delta's base fix, port 1 misses one later on
+    interleave(packets, lost={2: {4}, 1: {13}})
+    assert handled == expected(packets)
@@ -0,0 +1,97 @@
+import itertools
+import random
+
+import pytest
+
+from fec import chunk_count, parity_chunks, parse_parity, recover
+from transmitter import chunk_packets
+
+CHUNK = 16
+
+
+def frame(size, seed=1):
+    return random.Random(seed).randbytes(size)
+
+
+def split(data, chunk_size=CHUNK):
+    return {i: data[start:start + chunk_size] for i, start in enumerate(range(0, len(data), chunk_size))}
+
+
+def encode(data, k, m, chunk_size=CHUNK):
+    chunks = split(data, chunk_size)
+    parity = {(group, j): p for group, j, p in parity_chunks([chunks[i] for i in sorted(chunks)], k, m, chunk_size)}
+    return chunks, parity
+
+
+def lose(chunks, parity, data_lost=(), parity_lost=()):
+    return ({i: c for i, c in chunks.items() if i not in data_lost},
+            {key: p for key, p in parity.items() if key not in parity_lost})
+
+
+@pytest.mark.parametrize("k,m", [(4, 1), (4, 2), (8, 3)])
+def test_any_m_losses_in_a_group_are_rebuilt(k, m):
+    data = frame(k * CHUNK + 5)        # one full group and a short last group with a short last chunk
+    chunks, parity = encode(data, k, m)
+    for lost in itertools.combinations(range(k), m):
+        received, received_parity = lose(chunks, parity, lost)
+        recovered = recover(received, received_parity, k, m, len(data), CHUNK)
+        assert recovered == {i: chunks[i] for i in lost}
+
+
+def test_losses_in_the_same_residue_are_rebuilt():
+    # interleaved XOR parity could not rebuild chunks 0 and 2 with m=2
+    k, m = 8, 2
+    data = frame(3 * k * CHUNK)
+    chunks, parity = encode(data, k, m)
+    lost = {0, 2, 9, 11, 20, 21}
+    received, received_parity = lose(chunks, parity, lost)
+    recovered = recover(received, received_parity, k, m, len(data), CHUNK)
+    assert recovered == {i: chunks[i] for i in lost}
+
+
+def test_lost_parity_counts_against_the_group():
+    k, m = 4, 2
+    data = frame(2 * k * CHUNK)
+    chunks, parity = encode(data, k, m)
+    # group 0: one data and one parity chunk lost, still enough
+    received, received_parity = lose(chunks, parity, {1}, {(0, 0)})
+    assert recover(received, received_parity, k, m, len(data), CHUNK) == {1: chunks[1]}
+    # group 1: two data chunks lost but only one parity chunk arrived
+    received, received_parity = lose(chunks, parity, {4, 6}, {(1, 1)})
+    assert recover(received, received_parity, k, m, len(data), CHUNK) == {}
+
+
+def test_more_losses_than_parity_only_costs_that_group():
+    k, m = 4, 2
+    data = frame(3 * k * CHUNK)
+    chunks, parity = encode(data, k, m)
+    received, received_parity = lose(chunks, parity, {0, 1, 2, 9})
+    recovered = recover(received, received_parity, k, m, len(data), CHUNK)
+    assert recovered == {9: chunks[9]}
+
+
+def test_short_last_chunk_keeps_its_length():
+    k, m = 4, 2
+    data = frame(5 * CHUNK + 3)
+    chunks, parity = encode(data, k, m)
+    last = chunk_count(len(data), CHUNK) - 1
+    received, received_parity = lose(chunks, parity, {last})
+    recovered = recover(received, received_parity, k, m, len(data), CHUNK)
+    assert recovered[last] == data[last * CHUNK:]
+    assert len(recovered[last]) == 3
+
+
+def test_transmitter_parity_lines_match_the_decoder():
+    data = frame(10 * CHUNK)
+    packets = b"".join(chunk_packets(data, CHUNK, fec=(4, 2)))
+    headers = [line for line in packets.split(b"\n") if line.startswith(b"PR:")]
+    assert len(headers) == 3 * 2
+    group, j, fec = parse_parity(headers[-1][3:].decode())
+    assert (group, j) == (2, 1)
+    assert fec == (4, 2, len(data), CHUNK)
+
+
+@pytest.mark.parametrize("line", ["1,2,3", "0,0,0,2,100,16", "0,2,4,2,100,16", "0,0,4,2,100,0", "0,0,250,10,100,16"])
+def test_parse_parity_rejects_impossible_headers(line):
+    with pytest.raises(ValueError):
+        parse_parity(line)
@@ -0,0 +1,43 @@
+import sqlite3
+
+from frame_archive import FrameArchive
+
+OLD_SCHEMA = """
+CREATE TABLE frames (
+    frame INTEGER PRIMARY KEY, path TEXT NOT NULL, thumb_path TEXT, received REAL NOT NULL,
+    lat REAL, lon REAL, alt REAL, size INTEGER, chunks_received INTEGER, chunks_recovered INTEGER,
+    chunks_expected INTEGER, ports TEXT
+);
+"""
+
+
+def test_frames_keep_their_position_source(tmp_path):
+    archive = FrameArchive(root=tmp_path, session="flight")
+    archive.add(b"RIFF1", 48.1, 11.5, 1200, position="capture", chunks_received=3, chunks_expected=3, ports={1})
+    archive.add(b"RIFF2", "48.2", "11.6", "", chunks_received=2, chunks_expected=3, ports={1, 2})
+    newest, oldest = archive.page(archive.latest_frame(), 10)
+    assert (oldest['frame'], oldest['position'], oldest['lat'], oldest['alt']) == (1, "capture", 48.1, 1200.0)
+    assert (newest['frame'], newest['position'], newest['lat'], newest['alt']) == (2, "received", 48.2, None)
+    assert newest['ports'] == "1,2"
+
+
+def test_frame_numbers_continue_after_a_restart(tmp_path):
+    FrameArchive(root=tmp_path, session="flight").add(b"RIFF1")
+    archive = FrameArchive(root=tmp_path, session="flight")
+    assert archive.add(b"RIFF2")['frame'] == 2
+    assert [r['frame'] for r in archive.page(2, 1)] == [2]
+    assert archive.paths(3) is None
+
+
+def test_archive_from_before_the_position_column_is_upgraded(tmp_path):
+    (tmp_path / "flight").mkdir()
+    conn = sqlite3.connect(tmp_path / "flight" / "archive.db")
+    conn.executescript(OLD_SCHEMA)
+    conn.execute("INSERT INTO frames VALUES (1, 'old.webp', NULL, 0, 1.0, 2.0, 3.0, 5, 1, 0, 1, '1')")
+    conn.commit()
+    conn.close()
+    archive = FrameArchive(root=tmp_path, session="flight")
+    archive.add(b"RIFF2", 4.0, 5.0, 6.0, position="capture")
+    newest, old = archive.page(2, 10)
+    assert old['position'] is None
+    assert newest['position'] == "capture"
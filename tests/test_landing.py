@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from landing import LandingPredictor, move_m, offset_m
+
+LAT, LON = 48.0, 11.0
+
+
+def fly(predictor, fixes, t=0.0):
+    """Feed (east m, north m, alt) fixes one second apart; returns the last prediction"""
+    prediction = None
+    for east, north, alt in fixes:
+        lat, lon = move_m(LAT, LON, east, north)
+        prediction = predictor.update(lat, lon, alt, t)
+        t += 1.0
+    return prediction
+
+
+def flight(predictor, pad=500.0, top=1500.0, wind=5.0, descent=8.0):
+    """Pad wait, climb at 5 m/s, apogee, then descent, all in a steady east wind"""
+    fly(predictor, [(0.0, 0.0, pad)] * 5)
+    climb = int((top - pad) / 5)
+    fly(predictor, [(wind * i, 0.0, pad + 5.0 * i) for i in range(1, climb + 1)], t=5.0)
+    predictor.mark_apogee()
+    return fly(predictor, [(wind * (climb + i), 0.0, top - descent * i) for i in range(1, 21)], t=5.0 + climb)
+
+
+def test_pad_altitude_is_the_ground_and_wind_carries_east():
+    predictor = LandingPredictor()
+    prediction = flight(predictor)
+    assert (predictor.launched, predictor.ground()) == (True, 500.0)
+    lat, lon, alt, _ = predictor.last
+    east, north = offset_m(lat, lon, prediction['lat'], prediction['lon'])
+    # denser air lower down slows the parachute below the current descent rate
+    assert prediction['descent_rate'] == pytest.approx(8.0, rel=0.01)
+    assert (alt - 500.0) / 8.0 < prediction['time_to_land'] < (alt - 500.0) / 7.0
+    # the calm fixes on the pad pull the lowest band's wind down a little
+    assert east == pytest.approx(5.0 * prediction['time_to_land'], rel=0.05)
+    assert abs(north) < 1.0
+    assert prediction['radius_e'] > prediction['radius_n'] >= 0.0
+
+
+def test_no_prediction_before_apogee_or_while_climbing():
+    predictor = LandingPredictor()
+    fly(predictor, [(0.0, 0.0, 500.0 + 5.0 * i) for i in range(10)])
+    assert predictor.prediction is None
+    assert predictor.mark_apogee() is None
+
+
+def test_configured_ground_overrides_the_pad():
+    predictor = LandingPredictor(ground_alt=200.0)
+    flight(predictor)
+    assert predictor.ground() == 200.0
+
+
+def test_mid_flight_start_falls_back_to_sea_level():
+    predictor = LandingPredictor()
+    fly(predictor, [(0.0, 0.0, 9000.0 - 8.0 * i) for i in range(5)])
+    assert (predictor.launched, predictor.launch_alt, predictor.ground()) == (True, None, 0.0)
+
+
+def test_duplicate_fix_from_the_second_port_is_ignored():
+    predictor = LandingPredictor()
+    predictor.update(LAT, LON, 1000.0, 10.0)
+    predictor.update(LAT, LON, 990.0, 11.0)
+    rate = predictor.vrate
+    predictor.update(LAT, LON, 990.0, 11.2)
+    assert predictor.vrate == rate
+    assert sum(stats[0] for stats in predictor.bands.values()) == 1
+
+
+def test_state_survives_a_json_round_trip():
+    predictor = LandingPredictor()
+    prediction = flight(predictor)
+    restored = LandingPredictor.from_dict(json.loads(json.dumps(predictor.to_dict())), time_offset=-900.0)
+    assert restored.prediction == prediction
+    assert (restored.launch_alt, restored.launched, restored.apogee) == (500.0, True, True)
+    assert restored.last[3] == predictor.last[3] - 900.0
+    lat, lon, alt, t = restored.last
+    assert restored.update(*move_m(lat, lon, 5.0, 0.0), alt - 8.0, t + 1.0) == pytest.approx(
+        predictor.update(*move_m(lat, lon, 5.0, 0.0), alt - 8.0, predictor.last[3] + 1.0))
@@ -0,0 +1,59 @@
+import pytest
+
+from link_timing import MAX_CLOCK_DRIFT, SenderClock, SequenceFilter
+
+MS = 1_000_000  # ns
+
+
+def test_first_copy_wins_and_later_copies_are_dropped():
+    seen = SequenceFilter()
+    assert seen.claim((1, 1000))
+    assert not seen.claim((1, 1000))
+    assert seen.claim((2, 1010))
+    # a restarted payload reuses the sequence number with another send time
+    assert seen.claim((1, 5))
+
+
+def test_window_forgets_old_keys():
+    seen = SequenceFilter(window=3)
+    for seq in range(4):
+        assert seen.claim((seq, seq))
+    assert seen.claim((0, 0))
+    assert not seen.claim((3, 3))
+    assert len(seen.seen) == len(seen.order) == 3
+
+
+def test_latency_is_relative_to_the_fastest_packet():
+    clock = SenderClock()
+    # payload clock 5 s ahead of the ground; transit 80 ms, one packet at 30 ms
+    assert clock.update(1, 5000, 80 * MS) == (pytest.approx(0.0), 0)
+    assert clock.update(2, 5100, 130 * MS)[0] == pytest.approx(0.0)
+    clock.update(3, 5200, 230 * MS)
+    latency, gap = clock.update(4, 5300, 380 * MS)
+    assert latency == pytest.approx(0.05)
+    assert gap == 0
+
+
+def test_gaps_count_lost_packets():
+    clock = SenderClock()
+    clock.update(1, 0, 10 * MS)
+    assert clock.update(5, 40, 50 * MS)[1] == 3
+
+
+def test_minimum_follows_clock_drift():
+    clock = SenderClock()
+    clock.update(1, 0, 10 * MS)
+    # an hour later the ground clock runs 100 ms slow relative to the payload,
+    # within MAX_CLOCK_DRIFT, so that becomes the new baseline
+    hour_ms = 3600 * 1000
+    drift_ms = 0.9 * MAX_CLOCK_DRIFT * hour_ms
+    clock.update(2, hour_ms, int((hour_ms + 10 + drift_ms) * MS))
+    latency, _ = clock.update(3, hour_ms + 1000, int((hour_ms + 1010 + drift_ms) * MS))
+    assert latency == pytest.approx(0.0, abs=1e-6)
+
+
+def test_payload_restart_resets_the_clock():
+    clock = SenderClock()
+    clock.update(10, 100000, 10 * MS)
+    latency, gap = clock.update(1, 0, 20 * MS)
+    assert (latency, gap) == (0.0, 0)
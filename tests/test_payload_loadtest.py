@@ -0,0 +1,27 @@
+import io
+
+from payload_loadtest import receive_frame
+from transmitter import ChunkTransmitter
+
+
+class Radio(io.BytesIO):
+    """Far end of the payload link: reads the recorded downlink, swallows uplink writes"""
+
+    def write(self, data):
+        return len(data)
+
+
+def downlink(data, fec=None, thumbnail=None):
+    sent = []
+    ChunkTransmitter(sent.append, chunk_size=100, air_rate=10 ** 9, fec=fec).transmit(data, thumbnail)
+    return Radio(b"".join(sent))
+
+
+def test_counts_image_chunks_only():
+    chunks, received, parity, first_chunk = receive_frame(downlink(b"x" * 450, fec=(2, 1), thumbnail=b"t" * 40))
+    assert (chunks, received, parity) == (5, 450, 3)
+    assert first_chunk is not None
+
+
+def test_frame_without_chunks():
+    assert receive_frame(Radio(b"FC:1,0\n")) == (0, 0, 0, None)
@@ -0,0 +1,70 @@
+import base64
+import ctypes
+import os
+
+import pytest
+
+from progressive import ProgressivePreview, libwebp
+from transmitter import ChunkTransmitter
+
+CHUNK = 200
+
+
+def webp(width, height, quality=80):
+    lib = libwebp()
+    rgb = os.urandom(width * height * 3)
+    output = ctypes.c_void_p()
+    size = lib.WebPEncodeRGB(rgb, width, height, width * 3, quality, ctypes.byref(output))
+    try:
+        return ctypes.string_at(output, size)
+    finally:
+        lib.WebPFree(output)
+
+
+def chunks(data):
+    return {i: data[start:start + CHUNK] for i, start in enumerate(range(0, len(data), CHUNK))}
+
+
+needs_libwebp = pytest.mark.skipif(libwebp() is None, reason="libwebp not installed")
+
+
+def test_thumbnail_is_shown_until_rows_are_decoded():
+    preview = ProgressivePreview(interval=0)
+    assert preview.offer_thumbnail(b"RIFF-thumb")
+    assert preview.thumbnail
+    assert base64.b64decode(preview.image) == b"RIFF-thumb"
+    preview.clear()
+    assert preview.image is None and not preview.thumbnail
+
+
+@needs_libwebp
+def test_partial_frame_replaces_the_thumbnail():
+    data = chunks(webp(160, 160))
+    preview = ProgressivePreview(interval=0)
+    preview.offer_thumbnail(b"RIFF-thumb")
+    partial = {i: c for i, c in data.items() if i < len(data) * 2 // 3}
+    assert preview.offer(partial)
+    assert not preview.thumbnail
+    assert 0 < preview.rows < preview.height == 160
+    assert base64.b64decode(preview.image)[:4] == b"RIFF"
+    # a late thumbnail does not hide decoded rows
+    assert not preview.offer_thumbnail(b"RIFF-thumb")
+    preview.clear()
+
+
+@needs_libwebp
+def test_no_preview_without_chunk_zero():
+    data = chunks(webp(160, 160))
+    del data[0]
+    preview = ProgressivePreview(interval=0)
+    assert not preview.offer(data)
+    assert preview.image is None
+
+
+def test_thumbnail_goes_out_before_the_chunks():
+    sent = []
+    transmitter = ChunkTransmitter(sent.append, chunk_size=CHUNK, air_rate=10 ** 9)
+    transmitter.transmit(b"x" * 450, thumbnail=b"tiny")
+    assert sent[0] == b"PS:4\nIX:tiny\r\nPT:1\n"
+    assert sent[1].endswith(b"PL:0\n")
+    assert sent[-1] == b"FC:1,3\n"
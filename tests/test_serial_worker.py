@@ -0,0 +1,84 @@
+import sys
+import types
+
+import pytest
+
+import metrics
+from frame_archive import FrameArchive
+from ground import station
+
+
+class FakeSerial:
+    """Replays downlink bytes, then stops port 1's ingest loop"""
+
+    def __init__(self, data):
+        self.data = data
+        self.is_open = True
+        self.written = b""
+
+    @property
+    def in_waiting(self):
+        if not self.data:
+            station.running1 = False
+        return len(self.data)
+
+    def readline(self):
+        line, sep, self.data = self.data.partition(b"\n")
+        return line + sep
+
+    def read(self, size):
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+    def write(self, data):
+        self.written += data
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.fixture
+def run_port(monkeypatch, tmp_path):
+    """Run port 1's serial_worker over the given bytes until they are consumed"""
+    monkeypatch.chdir(tmp_path)     # station.log() appends to log.txt
+    monkeypatch.setattr(station, "image_parity", {})
+    monkeypatch.setattr(station, "image_fec", None)
+    monkeypatch.setattr(station, "frame_count", 0)
+
+    def run(data):
+        fake = FakeSerial(data)
+        monkeypatch.setitem(sys.modules, "serial", types.SimpleNamespace(Serial=lambda **kwargs: fake))
+        station.running1 = True
+        station.serial_worker("fake", 1)
+        return fake
+    return run
+
+
+def parse_errors():
+    return metrics.PARSE_ERRORS.values.get(("1",), 0)
+
+
+@pytest.mark.parametrize("line", [b"PR:3,x\n", b"PR:0,5,8,2,1000,200\n", b"FC:x\n", b"FC:2,y\n", b"PL:?\n"])
+def test_corrupted_line_costs_the_packet_not_the_port(run_port, line):
+    before = parse_errors()
+    run_port(line + b"RS:-81.5\n")
+    assert parse_errors() == before + 1
+    assert station.rssi_history_port1[-1] == -81.5
+    assert station.frame_count == 0
+    assert station.image_fec is None
+
+
+def test_frame_is_archived_at_its_capture_fix(run_port, monkeypatch, tmp_path):
+    archive = FrameArchive(root=tmp_path, session="flight")
+    monkeypatch.setattr(station, "frame_archive", archive)
+    monkeypatch.setattr(station, "image_data", {})
+    monkeypatch.setattr(station, "current_lat", "48.2")
+    run_port(b"PS:3\nIX:abc\r\nPL:0\nFC:1,1,48.1,11.5,1200.0\n"
+             b"PS:3\nIX:def\r\nPL:0\nFC:2,1\n")
+    second, first = archive.page(archive.latest_frame(), 10)
+    assert (first['lat'], first['lon'], first['alt'], first['position']) == (48.1, 11.5, 1200.0, "capture")
+    assert first['chunks_expected'] == 1
+    assert (second['lat'], second['position']) == (48.2, "received")
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+import state_journal
+from state_journal import JOURNAL_NAME, StateJournal, recent_session
+
+IDLE = 3600     # checkpoint interval long enough that the tests flush by hand
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_restart_replays_the_journal(tmp_path):
+    journal = StateJournal(tmp_path, interval=IDLE)
+    assert not journal.resumed
+    journal.gps("48.1", "11.5", "900", t=100.0)
+    journal.chunk(0, b"\x00RIFF", port=1)
+    journal.parity(0, 1, (4, 2, 300, 80), b"\xffparity")
+    journal.record("fc", n=3)
+    journal.log("Port1 Frame 3")
+    journal.close()
+
+    journal = StateJournal(tmp_path, interval=IDLE)
+    state = journal.state
+    assert journal.resumed
+    assert list(state.gps) == [("48.1", "11.5", "900", 100.0)]
+    assert state.chunks == {0: b"\x00RIFF"}
+    assert state.parity == {(0, 1): b"\xffparity"}
+    assert (state.fec, state.ports, state.frame_count) == ((4, 2, 300, 80), {1}, 3)
+    assert list(state.log) == ["Port1 Frame 3"]
+    journal.close()
+
+
+def test_saved_frame_clears_the_pending_chunks(tmp_path):
+    journal = StateJournal(tmp_path, interval=IDLE)
+    journal.chunk(0, b"a", port=2)
+    journal.record("saved")
+    journal.chunk(1, b"b", port=1)
+    journal.close()
+    state = StateJournal(tmp_path, interval=IDLE).state
+    assert (state.chunks, state.ports) == ({1: b"b"}, {1})
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = StateJournal(tmp_path, interval=IDLE)
+    journal.log("kept")
+    journal.close()
+    with open(tmp_path / JOURNAL_NAME, "a", encoding="utf-8") as f:
+        f.write('{"k": "log", "line": "to')
+
+    journal = StateJournal(tmp_path, interval=IDLE)
+    assert journal.resumed
+    assert list(journal.state.log) == ["kept"]
+    journal.close()
+
+
+def test_large_journal_is_compacted_to_one_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_journal, "COMPACT_BYTES", 2000)
+    journal = StateJournal(tmp_path, interval=IDLE)
+    for i in range(100):
+        journal.log(f"line {i}")
+    journal.checkpoint()
+    assert len(lines(tmp_path / JOURNAL_NAME)) > 100
+    journal.record("fc", n=7)
+    journal.checkpoint()
+    records = [json.loads(line) for line in lines(tmp_path / JOURNAL_NAME)]
+    assert [r['k'] for r in records] == ["snapshot"]
+    assert records[0]['frame_count'] == 7
+    journal.log("after")
+    journal.close()
+
+    state = StateJournal(tmp_path, interval=IDLE).state
+    assert state.frame_count == 7
+    assert list(state.log)[-2:] == ["line 99", "after"]
+
+
+def test_recent_session_picks_the_newest_fresh_journal(tmp_path):
+    now = time.time()
+    for session, age in (("old", 3600), ("newer", 120), ("newest", 60)):
+        (tmp_path / session).mkdir()
+        path = tmp_path / session / JOURNAL_NAME
+        path.write_text("{}\n")
+        os.utime(path, (now - age, now - age))
+    (tmp_path / "empty").mkdir()
+    assert recent_session(tmp_path, window=900) == "newest"
+    assert recent_session(tmp_path, window=30) is None
+    assert recent_session(tmp_path / "missing") is None
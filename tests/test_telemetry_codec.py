@@ -0,0 +1,82 @@
+import base64
+
+import pytest
+
+from telemetry_codec import (COMPACT_HEADER, KEYFRAME_INTERVAL, REC_GPS_DELTA, REC_GPS_FULL,
+                             TelemetryDecoder, TelemetryEncoder, capability_line)
+
+
+def track(count, start=(48.1, 11.5, 300.0)):
+    lat, lon, alt = start
+    return [(lat + i * 3e-4, lon - i * 2e-4, alt + 4.2 * i) for i in range(count)]
+
+
+def send(encoder, fixes):
+    """One TZ payload (the text after "TZ:") per fix"""
+    lines = []
+    for fix in fixes:
+        encoder.gps(*fix)
+        line = encoder.flush()
+        assert line.startswith(f"{COMPACT_HEADER}:".encode()) and line.endswith(b"\n")
+        lines.append(line[3:-1].decode())
+    return lines
+
+
+def kinds(payload):
+    return base64.b85decode(payload)[0]
+
+
+def decoded(decoder, payloads):
+    fixes = []
+    for payload in payloads:
+        for header, text in decoder.decode(payload):
+            assert header == "GS"
+            fixes.append(tuple(float(v) for v in text.split(",")))
+    return fixes
+
+
+def test_capability_line():
+    assert capability_line() == "TC:2\n"
+
+
+def test_round_trip_within_delta_resolution():
+    fixes = track(3 * KEYFRAME_INTERVAL)
+    got = decoded(TelemetryDecoder(), send(TelemetryEncoder(), fixes))
+    assert len(got) == len(fixes)
+    for (lat, lon, alt), (dlat, dlon, dalt) in zip(fixes, got):
+        assert dlat == pytest.approx(lat, abs=1e-5)
+        assert dlon == pytest.approx(lon, abs=1e-5)
+        assert dalt == pytest.approx(alt, abs=0.1)
+
+
+def test_keyframes_and_deltas():
+    payloads = send(TelemetryEncoder(), track(KEYFRAME_INTERVAL + 2))
+    assert [kinds(p) for p in payloads] == ([REC_GPS_FULL] + [REC_GPS_DELTA] * KEYFRAME_INTERVAL
+                                            + [REC_GPS_FULL])
+
+
+def test_jump_too_large_for_a_delta_sends_a_full_fix():
+    payloads = send(TelemetryEncoder(), [(48.1, 11.5, 300.0), (49.1, 11.5, 300.0)])
+    assert [kinds(p) for p in payloads] == [REC_GPS_FULL, REC_GPS_FULL]
+
+
+def test_lost_line_drops_deltas_until_the_next_full_fix():
+    fixes = track(2 * KEYFRAME_INTERVAL)
+    payloads = send(TelemetryEncoder(), fixes)
+    del payloads[3]
+    got = decoded(TelemetryDecoder(), payloads)
+    # fixes 0-2 before the loss, then nothing until the keyframe at KEYFRAME_INTERVAL + 1
+    expected = fixes[:3] + fixes[KEYFRAME_INTERVAL + 1:]
+    assert len(got) == len(expected)
+    for fix, value in zip(expected, got):
+        assert value[0] == pytest.approx(fix[0], abs=1e-5)
+
+
+def test_fix_counter_wraps():
+    fixes = track(300)
+    assert len(decoded(TelemetryDecoder(), send(TelemetryEncoder(), fixes))) == 300
+
+
+def test_unknown_record_is_an_error():
+    with pytest.raises(ValueError):
+        TelemetryDecoder().decode(base64.b85encode(bytes([3, 1, 0])).decode())
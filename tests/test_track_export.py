@@ -0,0 +1,61 @@
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from track_export import EXPORTERS, RECORDING_NAME, TrackRecorder, export, read_recording
+
+
+@pytest.fixture
+def recording(tmp_path):
+    recorder = TrackRecorder(tmp_path)
+    recorder.add(48.1, 11.5, 300.0, rssi1=-80.0, t=1000.0)
+    recorder.add(48.1, 11.5, 300.0, rssi2=-82.0, t=1001.0)     # same fix relayed by the other port
+    recorder.add(48.2, 11.6, 900.0, rssi2=-85.0, t=1010.0)
+    recorder.add(48.3, 11.7, None, t=1020.0)
+    recorder.file.close()
+    return tmp_path / RECORDING_NAME
+
+
+def exported(fmt, path):
+    out = io.StringIO()
+    export(fmt, lambda: read_recording(path), out, name="test")
+    return out.getvalue()
+
+
+def test_recording_skips_duplicates_and_torn_rows(recording):
+    with open(recording, "a", encoding="utf-8") as f:
+        f.write("1030.000,48.4,")     # power cut mid-row
+    points = list(read_recording(recording))
+    assert [p['time'] for p in points] == [1000.0, 1010.0, 1020.0]
+    assert points[0]['rssi1'] == -80.0 and points[0]['rssi2'] is None
+    assert points[2]['alt'] is None
+
+
+def test_csv(recording):
+    lines = exported("csv", recording).splitlines()
+    assert lines[0] == "time,lat,lon,alt,rssi1,rssi2"
+    assert lines[1] == "1970-01-01T00:16:40Z,48.1,11.5,300.0,-80.0,"
+    assert len(lines) == 4
+
+
+def test_gpx_and_kml_are_well_formed(recording):
+    gpx = ET.fromstring(exported("gpx", recording))
+    assert len(gpx.findall(".//{http://www.topografix.com/GPX/1/1}trkpt")) == 3
+    kml = ET.fromstring(exported("kml", recording))
+    placemarks = kml.findall(".//{http://www.opengis.net/kml/2.2}Placemark")
+    assert len(placemarks) == 1 + 3 + 1     # track, one per fix, current position
+
+
+def test_geojson(recording):
+    collection = json.loads(exported("geojson", recording))
+    assert collection['name'] == "test"
+    assert [f['geometry']['coordinates'] for f in collection['features']] == [
+        [11.5, 48.1, 300.0], [11.6, 48.2, 900.0], [11.7, 48.3]]
+
+
+@pytest.mark.parametrize("fmt", sorted(EXPORTERS))
+def test_empty_recording(tmp_path, fmt):
+    TrackRecorder(tmp_path).file.close()
+    assert exported(fmt, tmp_path / RECORDING_NAME)
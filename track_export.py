@@ -0,0 +1,187 @@
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+RECORDING_NAME = "track.csv"
+FIELDS = ("time", "lat", "lon", "alt", "rssi1", "rssi2")
+NETWORK_LINK_REFRESH = 5    # s between Google Earth reloads of the live track
+EXPORT_BATCH = 256          # points per streamed write
+DUPLICATE_WINDOW = 2.0      # s, the same fix relayed by both ports is recorded once
+
+
+def _number(value):
+    if value in (None, ""):
+        return None
+    return float(value)
+
+
+def _iso(t):
+    return datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _opt(value):
+    return "" if value is None else value
+
+
+class TrackRecorder:
+    """Append-only per-session track: one CSV row per GPS fix with the latest RSSI of each port.
+
+    Rows are line-buffered, so the recording is complete up to the last fix
+    even if the ground station dies, and exporters can stream it while it grows.
+    """
+
+    def __init__(self, directory, name=RECORDING_NAME):
+        self.path = os.path.join(directory, name)
+        new = not os.path.exists(self.path)
+        self.file = open(self.path, "a", encoding="utf-8", newline="", buffering=1)
+        self.writer = csv.writer(self.file)
+        self.lock = threading.Lock()
+        self.last = None    # ((lat, lon, alt), t)
+        if new:
+            self.writer.writerow(FIELDS)
+
+    def add(self, lat, lon, alt, rssi1=None, rssi2=None, t=None):
+        t = time.time() if t is None else t
+        with self.lock:
+            if self.last is not None and self.last[0] == (lat, lon, alt) and t - self.last[1] < DUPLICATE_WINDOW:
+                return
+            self.last = ((lat, lon, alt), t)
+            self.writer.writerow((f"{t:.3f}", lat, lon, alt, _opt(rssi1), _opt(rssi2)))
+
+    def points(self):
+        return read_recording(self.path)
+
+
+def read_recording(path):
+    """Stream points from a track recording"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                point = {name: _number(row[name]) for name in FIELDS}
+            except (TypeError, ValueError):
+                continue    # torn last row
+            if point['lat'] is not None and point['lon'] is not None:
+                yield point
+
+
+def _batched(lines):
+    """Join small pieces so file and HTTP writes happen EXPORT_BATCH points at a time"""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= EXPORT_BATCH:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+# Every exporter takes source, a callable returning a fresh point iterator,
+# and yields text; formats that need two passes simply call source twice.
+
+def csv_lines(source, name="flight"):
+    yield ",".join(FIELDS) + "\n"
+    for p in source():
+        yield f"{_iso(p['time'])},{p['lat']},{p['lon']},{_opt(p['alt'])},{_opt(p['rssi1'])},{_opt(p['rssi2'])}\n"
+
+
+def gpx_lines(source, name="flight"):
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<gpx version="1.1" creator="balloon" xmlns="http://www.topografix.com/GPX/1/1">\n'
+           f'<trk><name>{name}</name><trkseg>\n')
+    for p in source():
+        extensions = "".join(f"<{key}>{p[key]}</{key}>" for key in ("rssi1", "rssi2") if p[key] is not None)
+        if extensions:
+            extensions = f"<extensions>{extensions}</extensions>"
+        ele = f"<ele>{p['alt']}</ele>" if p['alt'] is not None else ""
+        yield f'<trkpt lat="{p["lat"]}" lon="{p["lon"]}">{ele}<time>{_iso(p["time"])}</time>{extensions}</trkpt>\n'
+    yield "</trkseg></trk>\n</gpx>\n"
+
+
+def geojson_lines(source, name="flight"):
+    yield '{"type": "FeatureCollection", "name": ' + json.dumps(name) + ', "features": [\n'
+    separator = ""
+    for p in source():
+        coordinates = [p['lon'], p['lat']] + ([p['alt']] if p['alt'] is not None else [])
+        feature = {
+            'type': "Feature",
+            'geometry': {'type': "Point", 'coordinates': coordinates},
+            'properties': {'time': _iso(p['time']), 'rssi1': p['rssi1'], 'rssi2': p['rssi2']},
+        }
+        yield separator + json.dumps(feature)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+def kml_lines(source, name="flight"):
+    """Track line plus one time-stamped placemark per fix (RSSI in ExtendedData), two passes over source"""
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+           f'<name>{name}</name>\n'
+           '<Style id="track"><LineStyle><color>ff00aaff</color><width>3</width></LineStyle></Style>\n'
+           '<Placemark><name>Track</name><styleUrl>#track</styleUrl>'
+           '<LineString><altitudeMode>absolute</altitudeMode><coordinates>\n')
+    last = None
+    for p in source():
+        last = p
+        yield f"{p['lon']},{p['lat']},{p['alt'] or 0}\n"
+    yield "</coordinates></LineString></Placemark>\n<Folder><name>Fixes</name>\n"
+    for p in source():
+        data = "".join(f'<Data name="{key}"><value>{p[key]}</value></Data>'
+                       for key in ("rssi1", "rssi2") if p[key] is not None)
+        yield (f"<Placemark><TimeStamp><when>{_iso(p['time'])}</when></TimeStamp>"
+               f"<ExtendedData>{data}</ExtendedData><Point><altitudeMode>absolute</altitudeMode>"
+               f"<coordinates>{p['lon']},{p['lat']},{p['alt'] or 0}</coordinates></Point></Placemark>\n")
+    yield "</Folder>\n"
+    if last is not None:
+        yield (f"<Placemark><name>Balloon</name><Point><altitudeMode>absolute</altitudeMode>"
+               f"<coordinates>{last['lon']},{last['lat']},{last['alt'] or 0}</coordinates></Point></Placemark>\n")
+    yield "</Document></kml>\n"
+
+
+EXPORTERS = {
+    'csv': (csv_lines, "text/csv"),
+    'gpx': (gpx_lines, "application/gpx+xml"),
+    'geojson': (geojson_lines, "application/geo+json"),
+    'kml': (kml_lines, "application/vnd.google-earth.kml+xml"),
+}
+
+
+def export(fmt, source, out, name="flight"):
+    """Write the track in fmt to the open text file out"""
+    lines, _ = EXPORTERS[fmt]
+    for chunk in _batched(lines(source, name)):
+        out.write(chunk)
+
+
+def network_link_kml(url, refresh=NETWORK_LINK_REFRESH):
+    """KML that makes Google Earth reload url every refresh seconds"""
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<kml xmlns="http://www.opengis.net/kml/2.2"><NetworkLink>\n'
+            '<name>Balloon (live)</name>\n'
+            f'<Link><href>{url}</href><refreshMode>onInterval</refreshMode>'
+            f'<refreshInterval>{refresh}</refreshInterval></Link>\n'
+            '</NetworkLink></kml>\n')
+
+
+def register(server, source, name="flight"):
+    """/export/track.<fmt> downloads and the live KML NetworkLink at /kml/live.kml"""
+    from flask import Response, request
+
+    @server.route("/export/track.<fmt>")
+    def export_track(fmt):
+        if fmt not in EXPORTERS:
+            return Response("Unknown format", status=404)
+        lines, mimetype = EXPORTERS[fmt]
+        return Response(_batched(lines(source, name)), mimetype=mimetype, headers={
+            "Content-Disposition": f'attachment; filename="{name}.{fmt}"',
+            "Cache-Control": "no-cache",
+        })
+
+    @server.route("/kml/live.kml")
+    def live_kml():
+        return Response(network_link_kml(request.host_url + "export/track.kml"),
+                        mimetype=EXPORTERS['kml'][1])
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+
+from fec import PARITY_HEADER, parity_chunks
+from protocol import sequence_line
+
+# Downlink framing understood by the ground serial_worker:
+#   text   "XX:<value>\n"
+#   thumb  "PS:<n>\n" + "IX:" + <n bytes> + "\r\n" + "PT:<frame>\n" (optional, before the chunks:
+#          a whole low-resolution WebP the ground shows until the frame arrives)
+#   chunk  "PS:<n>\n" + "IX:" + <n bytes> + "\r\n" + "PL:<index>\n"
+#   parity "PS:<n>\n" + "IX:" + <n bytes> + "\r\n" + "PR:<group>,<j>,<k>,<m>,<total>,<size>\n" (optional FEC)
+#   end    "FC:<frame>,<chunks>[,<lat>,<lon>,<alt>]\n" (the ground saves the frame when FC
+#          changes; <chunks> is the number of PL chunks the frame was cut into, and
+#          the position, when the payload had a fix, is where the image was captured)
+#   seq    "SQ:<seq>,<ms>\n" before every packet above, once the ground asked with SQ:1
+THUMBNAIL_HEADER = "PT"
+CHUNK_SIZE = 200        # bytes of image per IX packet, below the radio MTU
+AIR_RATE = 1200         # bytes/s the radio actually gets on air
+RADIO_BUFFER = 512      # bytes the radio can hold before it starts dropping
+TELEMETRY_POLL = 0.2    # s between telemetry flushes while idle
+
+
+def frame_chunk(chunk, trailer):
+    return f"PS:{len(chunk)}\n".encode() + b"IX:" + chunk + b"\r\n" + trailer.encode()
+
+
+def chunk_packets(data, chunk_size=CHUNK_SIZE, fec=None):
+    """Yield the framed packets for data: PS/IX/PL per chunk, plus PR parity after each group if fec=(k, m)"""
+    chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+    parity = {}
+    if fec:
+        k, m = fec
+        for group, j, parity_data in parity_chunks(chunks, k, m, chunk_size):
+            parity.setdefault(group, []).append((j, parity_data))
+    for index, chunk in enumerate(chunks):
+        yield frame_chunk(chunk, f"PL:{index}\n")
+        if fec and ((index + 1) % k == 0 or index == len(chunks) - 1):
+            group = index // k
+            for j, parity_data in parity.get(group, []):
+                yield frame_chunk(parity_data, f"{PARITY_HEADER}:{group},{j},{k},{m},{len(data)},{chunk_size}\n")
+
+
+class ChunkTransmitter:
+    """Paced downlink of image frames with telemetry interleaved between chunks.
+
+    Writes are held back so the bytes still queued in the radio (estimated from
+    the air rate) never exceed its buffer; telemetry lines queued with
+    send_telemetry go out between chunks, so position updates keep flowing
+    while an image is downlinked.
+    """
+
+    def __init__(self, write, chunk_size=CHUNK_SIZE, air_rate=AIR_RATE, radio_buffer=RADIO_BUFFER, fec=None):
+        self.write = write
+        self.chunk_size = chunk_size
+        self.fec = fec
+        self.air_rate = air_rate
+        self.radio_buffer = radio_buffer
+        self.frames = queue.Queue()
+        self.telemetry = queue.Queue()
+        self.frame = 0
+        self.sequence = False
+        self.seq = 0
+        self.backlog = 0.0
+        self.backlog_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def send_telemetry(self, header, value):
+        self.telemetry.put(f"{header}:{value}\n".encode())
+
+    def send_line(self, line):
+        """Queue an already framed telemetry line (e.g. a compact TZ burst)"""
+        self.telemetry.put(line)
+
+    def send_frame(self, data, thumbnail=None, position=None):
+        self.frames.put((data, thumbnail, position))
+
+    def _send(self, data):
+        with self.lock:
+            now = time.monotonic()
+            self.backlog = max(0.0, self.backlog - (now - self.backlog_time) * self.air_rate)
+            self.backlog_time = now
+            excess = self.backlog + len(data) - self.radio_buffer
+            if excess > 0:
+                time.sleep(excess / self.air_rate)
+                self.backlog = max(0.0, self.backlog - excess)
+                self.backlog_time = time.monotonic()
+            if self.sequence:
+                # stamped when handed to the radio, after pacing
+                self.seq += 1
+                data = sequence_line(self.seq, int(time.monotonic() * 1000)) + data
+            self.write(data)
+            self.backlog += len(data)
+
+    def _flush_telemetry(self):
+        while True:
+            try:
+                line = self.telemetry.get_nowait()
+            except queue.Empty:
+                return
+            self._send(line)
+
+    def transmit(self, data, thumbnail=None, position=None):
+        """Send one frame now, after its thumbnail if given; position is the (lat, lon, alt)
+        capture fix. Returns the frame number."""
+        self.frame += 1
+        chunks = -(-len(data) // self.chunk_size)
+        if thumbnail:
+            self._send(frame_chunk(thumbnail, f"{THUMBNAIL_HEADER}:{self.frame}\n"))
+        for packet in chunk_packets(data, self.chunk_size, self.fec):
+            self._flush_telemetry()
+            self._send(packet)
+        self._flush_telemetry()
+        end = f"FC:{self.frame},{chunks}"
+        if position and all(position):
+            end += ",{},{},{}".format(*position)
+        self._send(f"{end}\n".encode())
+        return self.frame
+
+    def run(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                data, thumbnail, position = self.frames.get(timeout=TELEMETRY_POLL)
+            except queue.Empty:
+                self._flush_telemetry()
+                continue
+            self.transmit(data, thumbnail, position)